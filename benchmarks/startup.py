@@ -0,0 +1,81 @@
+#!/usr/bin/env python
+"""
+Cold-start benchmark. Every run happens in a fresh interpreter and times the imports and each phase of
+Game.init() separately. Run it from the repo root:
+
+    python -m benchmarks.startup [--runs N] [--headless] [--sim-only]
+"""
+import os, sys
+import json
+import argparse
+import statistics
+import subprocess
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# runs inside the child interpreter and prints one JSON dict of phase -> seconds
+CHILD = '''
+import os, sys, json, time
+phases = {}
+def timed(name, func):
+    def wrapper(*args, **kwargs):
+        t0 = time.perf_counter()
+        out = func(*args, **kwargs)
+        phases[name] = time.perf_counter() - t0
+        return out
+    return wrapper
+
+t0 = time.perf_counter()
+import structures.sim
+phases['import structures.sim'] = time.perf_counter() - t0
+sim = timed('Simulation.init (headless)', structures.sim.Simulation().init)()
+
+if not SIM_ONLY:
+    t0 = time.perf_counter()
+    import pygame
+    phases['import pygame'] = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    import pacman
+    phases['import pacman'] = time.perf_counter() - t0
+
+    game = pacman.Game()
+    if not os.path.exists(game.GAME_FONT_PATH):
+        game.GAME_FONT_PATH = None # fall back on pygame's default font
+    pacman.pygame.init = timed('pygame.init', pacman.pygame.init)
+    for name in ('_init_game_objects', '_init_gfx', '_init_sfx'):
+        setattr(game, name, timed('Game.' + name, getattr(game, name)))
+    timed('Game.init', game.init)()
+
+print(json.dumps(phases))
+'''
+
+def run_once(sim_only: bool, headless: bool) -> dict[str, float]:
+
+    env = dict(os.environ)
+    if headless:
+        env['SDL_VIDEODRIVER'], env['SDL_AUDIODRIVER'] = 'dummy', 'dummy'
+
+    code = f'SIM_ONLY = {sim_only}\n' + CHILD
+    proc = subprocess.run([sys.executable, '-c', code], cwd=REPO_DIR, env=env, capture_output=True, text=True)
+    if proc.returncode != 0:
+        raise RuntimeError(f'Startup run failed:\n{proc.stderr}')
+
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+def main():
+
+    parser = argparse.ArgumentParser(description='Time imports and Game.init() phases from a cold start.')
+    parser.add_argument('--runs', type=int, default=10, help='number of fresh interpreters to time')
+    parser.add_argument('--headless', action='store_true', help='use SDL\'s dummy video/audio drivers')
+    parser.add_argument('--sim-only', action='store_true', help='only time the headless simulation core')
+    args = parser.parse_args()
+
+    runs = [run_once(args.sim_only, args.headless) for _ in range(args.runs)]
+
+    print(f'{"phase":<32}{"median ms":>12}{"min ms":>12}{"max ms":>12}')
+    for phase in runs[0]:
+        times = [run[phase]*1000 for run in runs]
+        print(f'{phase:<32}{statistics.median(times):>12.2f}{min(times):>12.2f}{max(times):>12.2f}')
+
+if __name__ == '__main__':
+    main()
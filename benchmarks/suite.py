@@ -0,0 +1,273 @@
+#!/usr/bin/env python
+"""
+Micro benchmarks for structures/ and macro benchmarks for the simulation and a full headless Game frame.
+Results go to a JSON file; --compare checks them against a stored baseline and exits with status 1 if
+anything got slower than --threshold percent. Run it from the repo root:
+
+    python -m benchmarks.suite [--out results.json] [--compare baseline.json] [--threshold 10] [-k name]
+"""
+import os, sys
+import json
+import timeit
+import argparse
+import platform
+import statistics
+
+# the game benchmark never needs a window or an audio device
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+os.environ.setdefault('PACMAN_MUTE', '1')
+
+from structures.maze import *
+from structures.position import *
+from structures.agent import Agent
+from structures.sim import Simulation
+
+# every benchmark is a setup function returning the callable to time (one call = one op)
+
+def bench_get_tile():
+    maze = Maze()
+    maze.init()
+    positions = [ListCoord(c, r) for r in range(maze.nrows) for c in range(maze.ncols)]
+
+    def run():
+        for pos in positions:
+            maze.get_tile(pos)
+    return run, len(positions)
+
+def bench_get_tile_rects():
+    maze = Maze()
+    maze.init()
+    edges = [ListCoord(c, r) for r in range(maze.nrows) for c in range(maze.ncols)
+             if maze.get_tile_rc(r, c) == Tile.EDGE]
+
+    def run():
+        for pos in edges:
+            maze.get_tile_rects(pos, 20)
+    return run, len(edges)
+
+def bench_flow_field():
+    maze = Maze()
+    maze.init()
+    bits = get_tile_bits(GHOST_TILES)
+    targets = [ListCoord(c, r) for r in range(maze.nrows) for c in range(maze.ncols)
+               if maze.get_tile_rc(r, c) in GHOST_TILES]
+
+    def run():
+        maze.flow_fields.clear() # time the BFS, not the LRU
+        for target in targets:
+            maze.get_flow_field(target, bits)
+    return run, len(targets)
+
+def bench_maze_init():
+    def run():
+        Maze().init()
+    return run, 1
+
+def bench_agent_move():
+    maze = Maze()
+    maze.init()
+    agent = Agent((1,1), speed_vec=(1,0))
+
+    def run():
+        agent.move(maze, agent.speed_vec, 0.15)
+    return run, 1
+
+def bench_player_update_pos():
+    sim = Simulation()
+    sim.init()
+    pacman = sim.pacman
+
+    def run():
+        pacman.update_pos(sim.maze)
+        if not pacman.is_moving: # bounce between walls so every call does real work
+            pacman.speed_vec = DIR_COORDS[get_reverse(pacman.speed_vec.get_direction())]
+    return run, 1
+
+def bench_enemy_update_speed():
+    sim = Simulation()
+    sim.init()
+    blinky = sim.blinky
+    blinky.target = sim.pacman.list_pos
+
+    def run():
+        blinky.last_turn_pos.x = -1 # force a turn decision on every call
+        blinky.update_speed(sim.maze)
+    return run, 1
+
+def bench_coord_ops():
+    a, b = FloatCoord(1.5, 2.5), FloatCoord(0.25, -0.5)
+
+    def run():
+        a + b
+        a - b
+        a * 0.5
+        a.iadd(b, 0.15)
+        a.isub(b)
+    return run, 5
+
+def bench_sim_step():
+    sim = Simulation()
+    sim.init()
+
+    def run():
+        if not sim.step():
+            sim.init()
+    return run, 1
+
+def bench_sim_snapshot():
+    sim = Simulation()
+    sim.init()
+    sim.step(n=200)
+
+    def run():
+        sim.restore(sim.snapshot())
+    return run, 1
+
+def bench_batch_step():
+    from structures.batch import BatchSimulation
+
+    batch = BatchSimulation(1000)
+    batch.init()
+
+    def run():
+        if not batch.step().any():
+            batch.init()
+    return run, 1000
+
+def bench_swarm_update():
+    import numpy as np
+    from structures.swarm import EnemySwarm
+
+    maze = Maze()
+    maze.init()
+    free = np.array([(c, r) for r in range(maze.nrows) for c in range(maze.ncols)
+                     if maze.get_tile_rc(r, c) in GHOST_TILES])
+    rng = np.random.default_rng(0)
+    swarm = EnemySwarm(1000, speed_norm=0.15)
+    swarm.init(maze, free[rng.integers(len(free), size=swarm.size)], speed_vec=(1, 0),
+               target=free[rng.integers(len(free), size=swarm.size)], at_home=False, waiting=False)
+
+    def run():
+        swarm.update()
+    return run, swarm.size
+
+def bench_env_step():
+    from structures.env import PacmanEnv, NO_ACTION
+
+    env = PacmanEnv()
+    env.reset(seed=0)
+
+    def run():
+        if env.step(NO_ACTION)[2]:
+            env.reset()
+    return run, 1
+
+def bench_vec_env_step():
+    import numpy as np
+    from structures.env import VecPacmanEnv, NO_ACTION
+
+    env = VecPacmanEnv(1000)
+    env.reset(seed=0)
+    actions = np.full(env.nenvs, NO_ACTION)
+
+    def run():
+        if env.step(actions)[2].all():
+            env.reset()
+    return run, env.nenvs
+
+def bench_game_frame():
+    import pacman
+
+    game = pacman.Game()
+    if not os.path.exists(game.GAME_FONT_PATH):
+        game.GAME_FONT_PATH = None # fall back on pygame's default font
+    game.init()
+
+    def run():
+        # one pass of pacman.main()'s loop, minus the frame-rate sleep in clock.tick
+        game.update_agent_imgs()
+        game.draw_game_objects()
+        if not game.playing and game.death_end != -1:
+            game.draw_game_over()
+        game.present()
+        game.sim.step(game.next_input)
+        if not game.playing:
+            game.sim.init()
+            game.maze, game.pacman = game.sim.maze, game.sim.pacman
+            game.blinky, game.pinky, game.inky = game.sim.blinky, game.sim.pinky, game.sim.inky
+        game.update_sfx()
+        game.handle_events()
+    return run, 1
+
+BENCHMARKS = {
+    'Maze.get_tile': bench_get_tile,
+    'Maze.get_tile_rects': bench_get_tile_rects,
+    'Maze.get_flow_field (uncached)': bench_flow_field,
+    'Maze.init': bench_maze_init,
+    'Agent.move': bench_agent_move,
+    'Player.update_pos': bench_player_update_pos,
+    'Enemy.update_speed': bench_enemy_update_speed,
+    'Coord ops': bench_coord_ops,
+    'Simulation.step': bench_sim_step,
+    'Simulation.snapshot+restore': bench_sim_snapshot,
+    'BatchSimulation.step (per game)': bench_batch_step,
+    'EnemySwarm.update (per ghost)': bench_swarm_update,
+    'PacmanEnv.step': bench_env_step,
+    'VecPacmanEnv.step (per env)': bench_vec_env_step,
+    'Game frame (headless)': bench_game_frame,
+}
+
+def run_benchmark(setup, repeat: int = 5) -> dict[str, float]:
+    """Returns nanoseconds per op (median and min over repeat runs) and how many calls each run made."""
+
+    run, nops = setup()
+    timer = timeit.Timer(run)
+    number, _ = timer.autorange()
+    times = [t / (number*nops) * 1e9 for t in timer.repeat(repeat, number)]
+
+    return {'ns_per_op': statistics.median(times), 'min_ns_per_op': min(times), 'calls': number}
+
+def compare(results: dict, baseline: dict, threshold: float) -> list[str]:
+    """Names of benchmarks whose median got more than threshold percent slower than the baseline."""
+
+    regressions = []
+    for name, row in results.items():
+        if name in baseline:
+            change = row['ns_per_op'] / baseline[name]['ns_per_op'] - 1
+            flag = 'REGRESSION' if change*100 > threshold else ''
+            print(f'{name:<36}{baseline[name]["ns_per_op"]:>14.1f}{row["ns_per_op"]:>14.1f}{change*100:>+9.1f}%  {flag}')
+            if flag:
+                regressions.append(name)
+
+    return regressions
+
+def main():
+
+    parser = argparse.ArgumentParser(description='Run the benchmark suite.')
+    parser.add_argument('--out', default='bench_results.json', help='where to write the results')
+    parser.add_argument('--compare', default=None, metavar='BASELINE', help='results file to compare against')
+    parser.add_argument('--threshold', type=float, default=10, help='percent slowdown counted as a regression')
+    parser.add_argument('--repeat', type=int, default=5, help='timed runs per benchmark')
+    parser.add_argument('-k', dest='filter', default=None, help='only run benchmarks whose name contains this')
+    args = parser.parse_args()
+
+    results = {}
+    for name, setup in BENCHMARKS.items():
+        if args.filter is None or args.filter in name:
+            results[name] = run_benchmark(setup, args.repeat)
+            print(f'{name:<36}{results[name]["ns_per_op"]:>14.1f} ns/op')
+
+    with open(args.out, 'w') as f:
+        json.dump({'python': platform.python_version(), 'machine': platform.machine(), 'results': results},
+                  f, indent=1)
+
+    if not args.compare is None:
+        with open(args.compare) as f:
+            baseline = json.load(f)['results']
+        print(f'\n{"benchmark":<36}{"baseline ns":>14}{"now ns":>14}{"change":>10}')
+        if compare(results, baseline, args.threshold):
+            sys.exit(1)
+
+if __name__ == '__main__':
+    main()
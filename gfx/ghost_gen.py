@@ -8,7 +8,7 @@ GHOST_DIRS = ['blinky', 'pinky', 'inky', 'clyde']
 
 GHOST_SIZE = 20*2
 SIZE_FACT = 0.9
-GHOST_COLORS = [(255,0,0), (255,192,255), (255,176,64), (0,224,255)]
+GHOST_COLORS = [(255,0,0), (255,192,255), (0,224,255), (255,176,64)] # same order as GHOST_DIRS
 
 def ghost_waves(ndiv=50):
     xoffset = GHOST_SIZE*(1-SIZE_FACT)/2+1
@@ -49,54 +49,51 @@ def ghost_eyes(wfact, hfact, pfact, xoff, yoff):
             list(zip(pxl, py, [pw]*4, [ph]*4)),
             list(zip(pxr, py, [pw]*4, [ph]*4)))
 
-def main():
-
-    pygame.init()
+def draw_ghost(color: tuple, wave: int, eye_ind: int) -> pygame.Surface:
+    """
+    Arguments:
+        color (tuple)  -- body color
+        wave (int)     -- which of the two skirt phases to draw
+        eye_ind (int)  -- index into the eye positions returned by ghost_eyes (see get_eye_angle)
 
-    screen = pygame.display.set_mode((GHOST_SIZE, GHOST_SIZE))
+    Returns:
+        A new GHOST_SIZE square surface with a transparent background. Needs no display.
+    """
 
     px, py0, py1 = ghost_waves()
-    wave0 = list(zip(px,py0))
-    wave1 = list(zip(px,py1))
-
     lt_eye, rt_eye, lt_pl, rt_pl = ghost_eyes(0.9, 1.2, 0.6, 0.2, 0.6)
 
-    running = True
-    nframes = 0
-    while running:
-
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                running = False
-        
-        screen.fill((0,0,0,0))
-
-        color_ind = nframes // (2400) % 4
-        pygame.draw.circle(screen, GHOST_COLORS[color_ind],
-                           (GHOST_SIZE/2, GHOST_SIZE/2), (GHOST_SIZE/2)*SIZE_FACT-1,
-                           draw_top_right=True, draw_top_left=True)
-        
-        if (nframes // 300) % 2 == 0:
-            pygame.gfxdraw.filled_polygon(screen, wave0, GHOST_COLORS[color_ind])
-        else:
-            pygame.gfxdraw.filled_polygon(screen, wave1, GHOST_COLORS[color_ind])
-        
-        eye_ind = nframes // (600) % 4
-        pygame.draw.ellipse(screen, (255,255,255), lt_eye[eye_ind])
-        pygame.draw.ellipse(screen, (255,255,255), rt_eye[eye_ind])
-        pygame.draw.ellipse(screen, (0,0,255), lt_pl[eye_ind])
-        pygame.draw.ellipse(screen, (0,0,255), rt_pl[eye_ind])
-        
-        pygame.display.flip()
-
-        if nframes % 300 == 0:
-            angle = ((9-eye_ind) % 4)*90
-            wave = (nframes // 300) % 2
-            ghost_dir = GHOST_DIRS[color_ind]
-            fname = f'a{angle:03}_w{wave}.png'
-            pygame.image.save(screen, os.path.join(SCRIPT_DIR, ghost_dir, fname))
-
-        nframes += 1
+    surf = pygame.Surface((GHOST_SIZE, GHOST_SIZE), pygame.SRCALPHA)
+
+    pygame.draw.circle(surf, color,
+                       (GHOST_SIZE/2, GHOST_SIZE/2), (GHOST_SIZE/2)*SIZE_FACT-1,
+                       draw_top_right=True, draw_top_left=True)
+    pygame.gfxdraw.filled_polygon(surf, list(zip(px, py1 if wave else py0)), color)
+
+    pygame.draw.ellipse(surf, (255,255,255), lt_eye[eye_ind])
+    pygame.draw.ellipse(surf, (255,255,255), rt_eye[eye_ind])
+    pygame.draw.ellipse(surf, (0,0,255), lt_pl[eye_ind])
+    pygame.draw.ellipse(surf, (0,0,255), rt_pl[eye_ind])
+
+    return surf
+
+def get_eye_angle(eye_ind: int) -> int:
+    """Facing angle (degrees, as used in the sprite file names) of an eye position."""
+    return ((9-eye_ind) % 4)*90
+
+def render_ghost(ghost_dir: str) -> dict[str, pygame.Surface]:
+    """Every wave phase and eye direction of one ghost (a name in GHOST_DIRS), keyed by file name."""
+
+    color = GHOST_COLORS[GHOST_DIRS.index(ghost_dir)]
+
+    return {f'a{get_eye_angle(eye_ind):03}_w{wave}.png': draw_ghost(color, wave, eye_ind)
+            for eye_ind in range(4) for wave in range(2)}
+
+def main():
+
+    for ghost_dir in GHOST_DIRS:
+        for fname, surf in render_ghost(ghost_dir).items():
+            pygame.image.save(surf, os.path.join(SCRIPT_DIR, ghost_dir, fname))
 
 if __name__ == '__main__':
     main()
\ No newline at end of file
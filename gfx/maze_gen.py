@@ -1,6 +1,9 @@
 #!/usr/env/bin python
 
 import sys, os
+import hashlib
+import argparse
+import numpy as np
 import pygame
 
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -8,6 +11,7 @@ sys.path.append(os.path.dirname(SCRIPT_DIR))
 
 from structures.maze import *
 from structures.position import *
+from structures.layout import CACHE_DIR
 
 TILE_SIZE = 20
 
@@ -15,95 +19,94 @@ BG_COLOR = (0,0,0)
 EDGE_COLOR = (0,0,255)
 GWALL_COLOR = (255,192,255)
 
-DIRS = [Direction.E, Direction.NE, Direction.N, Direction.NW,
-        Direction.W, Direction.SW, Direction.S, Direction.SE]
-
-def get_tile_rects(maze: Maze, pos: ListCoord) -> list[pygame.Rect]:
-
-    if not pos.is_in_bounds(maze.nrows, maze.ncols):
-        raise IndexError('Cannot get drawable rects for out-of-bounds tile.')
-    
-    if maze.get_tile(pos) != Tile.EDGE:
-        return []
-    
-    rects = []
-    dsp_pos = FloatCoord(x=pos.x*TILE_SIZE, y=pos.y*TILE_SIZE)
-    tile_rect = pygame.Rect(dsp_pos.x, dsp_pos.y, TILE_SIZE, TILE_SIZE)
-
-    for dir in DIRS:
-        adj = pos.get_adj(dir)
-
-        if maze.get_tile(adj) not in Maze.BOUNDARY_TILES:
-            tl = dsp_pos.midpoint_to(FloatCoord(x=adj.x*TILE_SIZE, y=adj.y*TILE_SIZE))
-            rects.append(pygame.Rect(tl.x, tl.y, TILE_SIZE, TILE_SIZE).clip(tile_rect))
-    
-    return rects
+def get_maze_hash(maze: Maze, tile_size: int = TILE_SIZE) -> str:
+    """Content hash of everything the maze image depends on: walls, size, tile size and colors."""
+
+    key = hashlib.sha256(repr((maze.nrows, maze.ncols, tile_size, BG_COLOR, EDGE_COLOR, GWALL_COLOR)).encode())
+    key.update(bytes(maze.grid).translate(DOTLESS)) # dots aren't part of the maze art
+
+    return key.hexdigest()[:32]
+
+def draw_maze(maze: Maze, tile_size: int = TILE_SIZE) -> pygame.Surface:
+    """
+    Arguments:
+        maze (Maze)     -- initialized maze to draw
+        tile_size (int) -- (optional; default=TILE_SIZE) side of one tile in pixels
+
+    Returns:
+        A new surface with the wall outlines and ghost doors. Needs no display.
+    """
+
+    surf = pygame.Surface((maze.ncols*tile_size, maze.nrows*tile_size))
+    surf.fill(BG_COLOR)
+
+    # solid walls, cut back wherever they touch a passable tile
+    for r in range(maze.nrows):
+        for c in range(maze.ncols):
+            tile = maze.get_tile_rc(r, c)
+
+            if tile == Tile.EDGE:
+                pygame.draw.rect(surf, EDGE_COLOR, (c*tile_size, r*tile_size, tile_size, tile_size))
+
+                for rect in maze.get_tile_rects(ListCoord(c, r), tile_size):
+                    pygame.draw.rect(surf, BG_COLOR, rect)
+            elif tile == Tile.GHOST_WALL:
+                pygame.draw.rect(surf, GWALL_COLOR,
+                                 (c*tile_size, (r+0.5)*tile_size+2, tile_size, tile_size/2-4))
+
+    # hollow the walls out to their outlines: erode the wall mask by a 3x3 square (leaving the
+    # image border alone) and clear every wall pixel that survives
+    pixels = pygame.surfarray.pixels3d(surf)
+    wall = np.all(pixels == EDGE_COLOR, axis=2)
+    inner = wall[1:-1,1:-1].copy()
+    for dx in (-1, 0, 1):
+        for dy in (-1, 0, 1):
+            inner &= wall[1+dx:wall.shape[0]-1+dx, 1+dy:wall.shape[1]-1+dy]
+    pixels[1:-1,1:-1][inner] = BG_COLOR
+    del pixels # unlock the surface
+
+    return surf
+
+def get_maze_img(maze: Maze, tile_size: int = TILE_SIZE, cache_dir: os.PathLike = None) -> pygame.Surface:
+    """
+    Same as draw_maze, but the image is cached as a png named by get_maze_hash (under CACHE_DIR/maze_img
+    unless cache_dir is given) and only drawn on a miss.
+    """
+
+    cache_dir = os.path.join(CACHE_DIR, 'maze_img') if cache_dir is None else cache_dir
+    cache_path = os.path.join(cache_dir, get_maze_hash(maze, tile_size) + '.png')
+
+    if os.path.exists(cache_path):
+        try:
+            return pygame.image.load(cache_path)
+        except pygame.error:
+            pass
+
+    surf = draw_maze(maze, tile_size)
+
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp_path = f'{cache_path}.{os.getpid()}.png'
+        pygame.image.save(surf, tmp_path)
+        os.replace(tmp_path, cache_path)
+    except (OSError, pygame.error):
+        pass
+
+    return surf
 
 def main():
 
+    parser = argparse.ArgumentParser(description='Draw the maze art for a layout, no window needed.')
+    parser.add_argument('--layout', default=None, help='text maze layout (default: the classic board)')
+    parser.add_argument('--tile-size', type=int, default=TILE_SIZE, help='side of one tile in pixels')
+    parser.add_argument('--out', default=os.path.join(SCRIPT_DIR, 'maze_sqr.png'), help='png to write')
+    args = parser.parse_args()
+
     maze = Maze()
-    maze.init()
-
-    pygame.init()
-    screen = pygame.display.set_mode((maze.ncols*TILE_SIZE, maze.nrows*TILE_SIZE))
-
-    running = True
-    nframes = 0
-    while running:
-
-        if nframes == 0:
-            screen.fill(BG_COLOR)
-
-            for r in range(maze.nrows):
-                for c in range(maze.ncols):
-
-                    tpos = ListCoord(x=c, y=r)
-
-                    if maze.get_tile(tpos) == Tile.EDGE:
-                        pygame.draw.rect(screen, EDGE_COLOR,
-                                         (tpos.x*TILE_SIZE, tpos.y*TILE_SIZE, TILE_SIZE, TILE_SIZE))
-
-                        trects = get_tile_rects(maze, tpos)
-
-                        for rect in trects:
-                            pygame.draw.rect(screen, BG_COLOR, rect)
-                    elif maze.get_tile(tpos) == Tile.GHOST_WALL:
-                        pygame.draw.rect(screen, GWALL_COLOR,
-                                         (tpos.x*TILE_SIZE, (tpos.y+0.5)*TILE_SIZE+2,
-                                          TILE_SIZE, TILE_SIZE/2-4))
-            
-            unfill = [[False for _ in range(screen.get_width())] for _ in range(screen.get_height())]
-
-            for r in range(1,len(unfill)-1):
-                for c in range(1,len(unfill[r])-1):
-
-                    if screen.get_at((c, r)) == EDGE_COLOR:
-                        all_blue = True
-                        pixel = ListCoord(x=c, y=r)
-                    
-                        for dir in DIRS:
-                            adj = pixel.get_adj(dir)
-
-                            if not screen.get_at(adj.get_tuple()) == EDGE_COLOR \
-                                and not unfill[adj.y][adj.x]:
-                                all_blue = False
-                    
-                        if all_blue:
-                            unfill[r][c] = True
-                            screen.set_at(pixel.get_tuple(), BG_COLOR)
-            
-            if os.path.exists(os.path.join(SCRIPT_DIR, 'maze_sqr.png')):
-                os.remove(os.path.join(SCRIPT_DIR, 'maze_sqr.png'))
-
-            pygame.image.save(screen, os.path.join(SCRIPT_DIR, 'maze_sqr.png'))
-        
-        nframes += 1
-        
-        pygame.display.flip()
-
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                running = False
+    maze.init(args.layout)
+
+    pygame.image.save(get_maze_img(maze, args.tile_size), args.out)
+    print(f'wrote {args.out}')
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,103 @@
+#!/usr/bin/env python
+"""
+Render every sprite set (Pac-Man and each ghost) off-screen in one call, one worker process per set,
+and write them out as the individual pngs the game loads or as one packed atlas with a JSON index.
+Run it from the repo root:
+
+    python -m gfx.sprite_gen [--out DIR] [--atlas PNG] [--processes N]
+"""
+import os
+import json
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+import pygame
+
+from gfx import ghost_gen, pacman_gen
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+SPRITE_SETS = ['pacman'] + ghost_gen.GHOST_DIRS
+
+def _render_set(name: str) -> dict[str, tuple[tuple[int, int], bytes]]:
+    # runs in a worker: surfaces don't pickle, so hand back raw RGBA bytes
+    frames = pacman_gen.render_pacman() if name == 'pacman' else ghost_gen.render_ghost(name)
+
+    return {fname: (surf.get_size(), pygame.image.tobytes(surf, 'RGBA')) for fname, surf in frames.items()}
+
+def render_sprites(names: list[str] = SPRITE_SETS, processes: int = None) -> dict[str, dict[str, pygame.Surface]]:
+    """
+    Arguments:
+        names (list[str]) -- (optional; default=SPRITE_SETS) sprite sets to render
+        processes (int)   -- (optional; default=None) worker processes, None for one per CPU and 1
+                             to render in this process
+
+    Returns:
+        {set name: {file name: surface}} for every frame of every set. Needs no display.
+    """
+
+    if processes == 1:
+        results = [_render_set(name) for name in names]
+    else:
+        with ProcessPoolExecutor(max_workers=processes) as pool:
+            results = list(pool.map(_render_set, names))
+
+    return {name: {fname: pygame.image.frombytes(data, size, 'RGBA') for fname, (size, data) in frames.items()}
+            for name, frames in zip(names, results)}
+
+def write_pngs(sprites: dict[str, dict[str, pygame.Surface]], out_dir: os.PathLike = SCRIPT_DIR) -> None:
+    """Save every frame as out_dir/<set name>/<file name>, the layout the game loads from."""
+
+    for name, frames in sprites.items():
+        os.makedirs(os.path.join(out_dir, name), exist_ok=True)
+        for fname, surf in frames.items():
+            pygame.image.save(surf, os.path.join(out_dir, name, fname))
+
+def write_atlas(sprites: dict[str, dict[str, pygame.Surface]], path: os.PathLike) -> dict[str, list[int]]:
+    """
+    Pack every frame into one png (a row per set) and write a JSON index next to it (same name, .json)
+    mapping '<set name>/<file name>' to [x, y, w, h]. Returns the index.
+    """
+
+    index, width, height = {}, 0, 0
+    for name, frames in sprites.items():
+        x, shelf = 0, 0
+        for fname, surf in frames.items():
+            w, h = surf.get_size()
+            index[f'{name}/{fname}'] = [x, height, w, h]
+            x += w
+            shelf = max(shelf, h)
+        width = max(width, x)
+        height += shelf
+
+    atlas = pygame.Surface((max(width, 1), max(height, 1)), pygame.SRCALPHA)
+    for name, frames in sprites.items():
+        for fname, surf in frames.items():
+            atlas.blit(surf, index[f'{name}/{fname}'][:2], special_flags=pygame.BLEND_RGBA_MAX)
+
+    pygame.image.save(atlas, path)
+    with open(os.path.splitext(path)[0] + '.json', 'w') as f:
+        json.dump(index, f, indent=1)
+
+    return index
+
+def main():
+
+    parser = argparse.ArgumentParser(description='Render all sprite frames off-screen.')
+    parser.add_argument('--out', default=SCRIPT_DIR, help='directory to write the per-set pngs to')
+    parser.add_argument('--atlas', default=None, help='write one packed atlas png (+ .json index) instead')
+    parser.add_argument('--processes', type=int, default=None, help='worker processes (default: one per CPU)')
+    args = parser.parse_args()
+
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+
+    sprites = render_sprites(processes=args.processes)
+
+    if args.atlas is None:
+        write_pngs(sprites, args.out)
+        print(f'wrote {sum(len(frames) for frames in sprites.values())} frames to {args.out}')
+    else:
+        write_atlas(sprites, args.atlas)
+        print(f'wrote {args.atlas}')
+
+if __name__ == '__main__':
+    main()
@@ -1,17 +1,24 @@
 #!/usr/bin/env python
 import os
-import pygame, simpleaudio as sa, math
-from enum import Enum
+import argparse
+import pygame
 
-from structures import maze as mz, position as pos, agent
+from structures import maze as mz, position as pos, assets
+from structures.sim import Simulation, GhostMode
+from structures.audio import Audio
+from structures.profiler import FrameProfiler, NullProfiler
+from structures.replay import save_replay
 
 # ================== GLOBAL CONSTANTS ==================
 DEBUG = False
+DIRTY_RECTS = os.environ.get('PACMAN_DIRTY_RECTS', '0') == '1' # only push changed screen areas
+MUTE = os.environ.get('PACMAN_MUTE', '0') == '1' # run without opening the audio device
+PROFILE = os.environ.get('PACMAN_PROFILE') # per-phase frame timings are written here (.json or .csv) on exit
+PROFILE_OVERLAY = os.environ.get('PACMAN_PROFILE_OVERLAY', '0') == '1'
+RECORD = os.environ.get('PACMAN_RECORD') # every input is logged here on exit, replay with structures/replay.py
+PHASES = ['agent_imgs', 'draw', 'clock_tick', 'present', 'sim', 'sfx', 'events'] # in main loop order
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 
-class GhostMode(Enum):
-    CHASE, SCATTER = 0, 1
-
 class Game:
 
     def __init__(self) -> None:
@@ -23,102 +30,80 @@ class Game:
 
         # other game values
         self.initialized = False
-        self.MODES = list(GhostMode)
-        self.mode_ind = 1
-        self.mode_changes = [7, 27, 34, 54, 59, 79, 84, math.inf]
-        self.next_mode_change = 0
 
-        # game objects
+        # game objects (owned by the simulation, aliased here for drawing)
+        self.sim = None
         self.maze, self.pacman = None, None
         self.blinky, self.pinky, self.inky = None, None, None
 
         # pygame
         self.score_rows = 3
         self.screen, self.clock = None, None
-        self.nframes, self.frame_rate = 0, 60
-        self.running, self.playing = False, False
+        self.frame_rate = 60
+        self.running = False
         self.start_frame = 1
+        self.next_input = None
 
         # other gfx
         self.game_font_lg, self.game_over = None, None
         self.game_font_md, self.score_label, self.score = None, None, None
         self.maze_img = None
+        self.dot_layer, self.drawn_dots = None, None
+        self.background = None
+        self.drawn_score, self.score_rect = None, None
+        self.sprite_rects = []
+        self.full_redraw, self.dirty_rects = True, None
         self.pm_img = None
+        self.blank_img = None
         self.bk_img, self.pk_img, self.nk_img = None, None, None
+        self.overlay_font, self.overlay = None, None
         self.death_start, self.death_end = -1, -1
 
         # sfx
-        self.start_sound, self.play_start = None, None
-        self.waka, self.play_waka = None, None
-        self.death, self.play_death = None, None
-        self.sirens, self.play_siren = None, None
-        self.siren_changes = [7, 34, 59, 84, math.inf]
-        self.next_siren_change = 0
+        self.audio = None
+        self.siren_ind = 0
     
     def _init_game_objects(self) -> None:
 
-        self.maze = mz.Maze()
-        self.maze.init()
-
-        self.pacman = agent.Player(os.path.join(SCRIPT_DIR, 'gfx', 'pacman'),
-                                   (self.maze.ncols//2-1,self.maze.nrows-8),
-                                   speed_vec=(1,0),
-                                   speed_norm=0.15)
-        self.pacman.pos.x += 0.5
-
-        self.blinky = agent.Enemy(os.path.join(SCRIPT_DIR, 'gfx', 'blinky'),
-                                  (self.maze.ncols//2-1,11),
-                                  speed_vec=(1,0),
-                                  speed_norm=0.15)
-        self.blinky.pos.x += 0.5
-        self.blinky.at_home = False
-        self.blinky.waiting = False
-        self.blinky.passable_tiles = [mz.Tile.EMPTY, mz.Tile.DOT]
-
-        self.pinky = agent.Enemy(os.path.join(SCRIPT_DIR, 'gfx', 'pinky'),
-                                 (self.maze.ncols//2-1,14),
-                                 speed_vec=(0,-1),
-                                 speed_norm=0.15)
-        self.pinky.pos.x += 0.5
-        self.pinky.waiting = False
-
-        self.inky = agent.Enemy(os.path.join(SCRIPT_DIR, 'gfx', 'inky'),
-                                (self.maze.ncols//2-2,14),
-                                speed_vec=(0,-1),
-                                speed_norm=0.15)
-        self.inky.pos.x -= 0.5
-        self.inky.pos.y -= 0.5
-        self.inky.target = pos.ListCoord(0, self.maze.nrows-1)
+        self.sim = Simulation(os.path.join(SCRIPT_DIR, 'gfx'), frame_rate=self.frame_rate)
+        self.sim.init()
+
+        self.maze, self.pacman = self.sim.maze, self.sim.pacman
+        self.blinky, self.pinky, self.inky = self.sim.blinky, self.sim.pinky, self.sim.inky
     
     def _init_gfx(self) -> None:
 
         self.screen = pygame.display.set_mode((self.maze.ncols*self.TILE_SIZE,
                                                (self.maze.nrows+self.score_rows)*self.TILE_SIZE))
         self.clock = pygame.time.Clock()
+        assets.convert_sheets()
 
         self.game_font_lg = pygame.font.Font(self.GAME_FONT_PATH, self.TILE_SIZE*2)
         self.game_font_md = pygame.font.Font(self.GAME_FONT_PATH, self.TILE_SIZE)
         self.game_over = self.game_font_lg.render('GAME OVER', False, (255,255,255))
         self.score_label = self.game_font_md.render('SCORE', False, (255,255,255))
+        self.overlay_font = pygame.font.Font(None, 16)
 
         self.maze_img = pygame.image.load(os.path.join(SCRIPT_DIR, 'gfx', 'maze_sqr.png'))
-        self.pm_img = self.pacman.mimages[-1]
-        self.bk_img = self.blinky.images[0][0]
-        self.pk_img = self.pinky.images[1][0]
-        self.nk_img = self.inky.images[3][0]
+        self.dot_layer = self.maze_img.copy()
+        self.drawn_dots = set()
+        self.update_dot_layer()
+
+        # everything that doesn't move: score label, maze and dots
+        self.background = pygame.Surface(self.screen.get_size())
+        self.background.fill((0,0,0))
+        self.background.blit(self.score_label, (1,1))
+        self.background.blit(self.dot_layer, (0, self.score_rows*self.TILE_SIZE))
+        self.pm_img = self.pacman.get_move_image(0)
+        self.blank_img = pygame.Surface((1,1))
+        self.bk_img = self.blinky.sheet.get(self.blinky.names[0][0])
+        self.pk_img = self.pinky.sheet.get(self.pinky.names[1][0])
+        self.nk_img = self.inky.sheet.get(self.inky.names[3][0])
     
     def _init_sfx(self) -> None:
 
-        self.start_sound = sa.WaveObject.from_wave_file(os.path.join(SCRIPT_DIR, 'sfx', 'start_up.wav'))
-        self.waka = sa.WaveObject.from_wave_file(os.path.join(SCRIPT_DIR, 'sfx', 'waka.wav'))
-        self.death = sa.WaveObject.from_wave_file(os.path.join(SCRIPT_DIR, 'sfx', 'death.wav'))
-        self.sirens = [sa.WaveObject.from_wave_file(os.path.join(SCRIPT_DIR, 'sfx', f'siren_{i+1}.wav'))
-                       for i in range(5)]
-        
-        self.play_start = sa.PlayObject(0)
-        self.play_waka = sa.PlayObject(0)
-        self.play_death = sa.PlayObject(0)
-        self.play_siren = sa.PlayObject(0)
+        self.audio = Audio(os.path.join(SCRIPT_DIR, 'sfx'), enabled=not MUTE)
+        self.audio.init()
     
     def init(self) -> None:
 
@@ -129,11 +114,18 @@ class Game:
         self._init_sfx()
 
         self.running = True
-        self.playing = True
         self.initialized = True
     
+    @property
+    def nframes(self) -> int:
+        return self.sim.nframes
+    
+    @property
+    def playing(self) -> bool:
+        return self.sim.playing
+    
     def get_mode(self) -> GhostMode:
-        return self.MODES[self.mode_ind]
+        return self.sim.get_mode()
     
     def update_agent_imgs(self) -> None:
 
@@ -141,60 +133,123 @@ class Game:
             RuntimeError('Game not yet initialized, draw methods unavailable.')
 
         if self.playing:
-            self.pm_img = pygame.transform.rotate(self.pacman.get_move_image(self.nframes),
-                                                  pos.get_dir_angle(self.pacman.speed_vec.get_direction()))
+            self.pm_img = self.pacman.get_move_image(self.nframes, self.pacman.speed_vec.get_direction())
             self.bk_img = self.blinky.get_image(self.nframes, self.start_frame)
             self.pk_img = self.pinky.get_image(self.nframes, self.start_frame)
             self.nk_img = self.inky.get_image(self.nframes, self.start_frame)
         elif not self.playing and self.death_end == -1:
-            self.bk_img = pygame.Surface((1,1))
-            self.pk_img = pygame.Surface((1,1))
-            self.nk_img = pygame.Surface((1,1))
-            self.pm_img = self.pacman.get_death_image(self.nframes, self.death_start)
+            self.bk_img = self.blank_img
+            self.pk_img = self.blank_img
+            self.nk_img = self.blank_img
+            self.pm_img = self.pacman.get_death_image(self.nframes, self.death_start,
+                                                      self.pacman.speed_vec.get_direction())
 
             if not self.pm_img:
-                self.pm_img = pygame.Surface((1,1))
+                self.pm_img = self.blank_img
                 self.death_end = self.nframes
-            
-            self.pm_img = pygame.transform.rotate(self.pm_img,
-                                                  pos.get_dir_angle(self.pacman.speed_vec.get_direction()))
+    
+    def get_blit_pos(self, agent) -> tuple[float, float]:
+        """Screen position of an agent's top-left corner (agent.get_tl() scaled and offset, as a tuple)."""
+
+        return ((agent.pos.x-0.5)*self.TILE_SIZE,
+                (agent.pos.y-0.5)*self.TILE_SIZE + self.score_rows*self.TILE_SIZE)
+    
+    def update_dot_layer(self) -> list[pygame.Rect]:
+        """
+        Bring the cached maze+dots surface (and the background built from it) in line with the
+        maze's live dot set. Eaten dots are erased by restoring their tile from maze_img, so a
+        frame with no eating does no work. Returns the screen rects that changed.
+        """
+
+        if len(self.drawn_dots) == self.maze.get_ndots():
+            return []
+        
+        tiles = []
+        for r, c in self.drawn_dots - self.maze.dots:
+            tile = pygame.Rect(c*self.TILE_SIZE, r*self.TILE_SIZE, self.TILE_SIZE, self.TILE_SIZE)
+            self.dot_layer.blit(self.maze_img, tile, tile)
+            tiles.append(tile)
+        for r, c in self.maze.dots - self.drawn_dots:
+            pygame.draw.circle(self.dot_layer, self.DOT_COLOR,
+                               ((c+0.5)*self.TILE_SIZE, (r+0.5)*self.TILE_SIZE), 2)
+            tiles.append(pygame.Rect(c*self.TILE_SIZE, r*self.TILE_SIZE, self.TILE_SIZE, self.TILE_SIZE))
+        
+        self.drawn_dots = set(self.maze.dots)
+
+        rects = [tile.move(0, self.score_rows*self.TILE_SIZE) for tile in tiles]
+        if not self.background is None:
+            for tile, rect in zip(tiles, rects):
+                self.background.blit(self.dot_layer, rect, tile)
+        
+        return rects
     
     def draw_game_objects(self) -> None:
         
         if not self.initialized:
             raise RuntimeError('Game not yet initialized, draw methods unavailable.')
         
-        self.screen.fill((0,0,0))
-
-        offset = pos.FloatCoord(x=0, y=self.score_rows*self.TILE_SIZE)
+        tiles = self.update_dot_layer()
+
+        score_changed = self.drawn_score != self.pacman.score
+        if score_changed:
+            self.score = self.game_font_md.render(str(self.pacman.score), False, (255,255,255))
+            self.drawn_score = self.pacman.score
+
+        if self.full_redraw:
+            self.screen.blit(self.background, (0,0))
+            self.dirty_rects = None
+        else:
+            # restore everything that changed or was covered last frame from the background
+            self.dirty_rects = tiles + self.sprite_rects
+            if score_changed:
+                self.dirty_rects.append(self.score_rect)
+            for rect in self.dirty_rects:
+                self.screen.blit(self.background, rect, rect)
         
-        self.score = self.game_font_md.render(str(self.pacman.score), False, (255,255,255))
-        self.screen.blit(self.score_label, (1,1))
-        self.screen.blit(self.score, (1, self.TILE_SIZE+1))
-
-        self.screen.blit(self.maze_img, offset.get_tuple())
+        if self.full_redraw or score_changed:
+            self.score_rect = self.screen.blit(self.score, (1, self.TILE_SIZE+1))
+            if not self.dirty_rects is None:
+                self.dirty_rects.append(self.score_rect)
+    
+        self.sprite_rects = [self.screen.blit(self.pm_img, self.get_blit_pos(self.pacman)),
+                             self.screen.blit(self.bk_img, self.get_blit_pos(self.blinky)),
+                             self.screen.blit(self.pk_img, self.get_blit_pos(self.pinky)),
+                             self.screen.blit(self.nk_img, self.get_blit_pos(self.inky))]
+        if not self.overlay is None:
+            self.sprite_rects.append(self.screen.blit(self.overlay, (self.screen.get_width()-self.overlay.get_width()-2, 2)))
+        if not self.dirty_rects is None:
+            self.dirty_rects += self.sprite_rects
+    
+    def set_overlay(self, stats: dict[str, dict[str, float]]) -> None:
+        """Show per-phase frame timings (as returned by FrameProfiler.get_stats) in the top-right corner."""
 
-        for r in range(self.maze.nrows):
-            for c in range(self.maze.ncols):
+        lines = [f'{phase} {row["p50"]:.2f} / {row["p99"]:.2f} ms' for phase, row in stats.items()]
+        surfs = [self.overlay_font.render(line, True, (0,255,0)) for line in lines]
 
-                if self.maze.get_tile(pos.ListCoord(x=c, y=r)) == mz.Tile.DOT:
-                    pygame.draw.circle(self.screen, self.DOT_COLOR,
-                                       ((c+0.5)*self.TILE_SIZE, (r+self.score_rows+0.5)*self.TILE_SIZE), 2)
-    
-        pm_pos = self.pacman.get_tl()*self.TILE_SIZE + offset
-        self.screen.blit(self.pm_img, pm_pos.get_tuple())
-        bk_pos = self.blinky.get_tl()*self.TILE_SIZE + offset
-        self.screen.blit(self.bk_img, bk_pos.get_tuple())
-        pk_pos = self.pinky.get_tl()*self.TILE_SIZE + offset
-        self.screen.blit(self.pk_img, pk_pos.get_tuple())
-        nk_pos = self.inky.get_tl()*self.TILE_SIZE + offset
-        self.screen.blit(self.nk_img, nk_pos.get_tuple())
+        self.overlay = pygame.Surface((max(s.get_width() for s in surfs), sum(s.get_height() for s in surfs)))
+        y = 0
+        for surf in surfs:
+            self.overlay.blit(surf, (0, y))
+            y += surf.get_height()
     
     def draw_game_over(self) -> None:
 
         x = (self.screen.get_width()-self.game_over.get_width())/2
         y = (self.screen.get_height()-self.game_over.get_height())/2
-        self.screen.blit(self.game_over, (x,y))
+        rect = self.screen.blit(self.game_over, (x,y))
+
+        if not self.dirty_rects is None:
+            self.dirty_rects.append(rect)
+    
+    def present(self) -> None:
+        """Push this frame to the display: the dirty rects in DIRTY_RECTS mode, else a full flip."""
+
+        if self.dirty_rects is None:
+            pygame.display.flip()
+        else:
+            pygame.display.update(self.dirty_rects)
+        
+        self.full_redraw = not DIRTY_RECTS
     
     def handle_events(self) -> None:
 
@@ -206,13 +261,13 @@ class Game:
                     keys = pygame.key.get_pressed()
 
                     if keys[pygame.K_UP]:
-                        self.pacman.next_speed = pos.FloatCoord(dir=pos.Direction.N)
+                        self.next_input = pos.Direction.N
                     if keys[pygame.K_DOWN]:
-                        self.pacman.next_speed = pos.FloatCoord(dir=pos.Direction.S)
+                        self.next_input = pos.Direction.S
                     if keys[pygame.K_LEFT]:
-                        self.pacman.next_speed = pos.FloatCoord(dir=pos.Direction.W)
+                        self.next_input = pos.Direction.W
                     if keys[pygame.K_RIGHT]:
-                        self.pacman.next_speed = pos.FloatCoord(dir=pos.Direction.E)
+                        self.next_input = pos.Direction.E
     
     def start_death_sequence(self) -> None:
 
@@ -221,76 +276,99 @@ class Game:
 
         pygame.time.delay(500)
 
-        self.pacman.eating = False
         self.pacman.chomp_rate = 8
-        self.death_start = self.nframes
-        self.playing = False
-        self.play_death = self.death.play()
+        self.death_start = self.sim.death_frame
+        self.audio.play('death')
+    
+    def update_sfx(self) -> None:
+
+        siren = f'siren_{self.siren_ind+1}'
+
+        if self.playing and not self.audio.is_playing(siren):
+            self.audio.loop(siren)
+        if not self.playing and self.audio.is_playing(siren):
+            self.audio.stop(siren)
+        if self.siren_ind != self.sim.next_siren_change:
+            self.audio.stop(siren)
+            self.siren_ind = self.sim.next_siren_change
+            if self.playing:
+                self.audio.loop(f'siren_{self.siren_ind+1}')
+        if self.pacman.eating and not self.audio.is_playing('waka'):
+            self.audio.loop('waka')
+        elif not self.pacman.eating and self.audio.is_playing('waka'):
+            self.audio.stop('waka')
 
 # ================== MAIN FUNCTION ==================
-def main():
+def main(argv: list[str] = None):
+
+    parser = argparse.ArgumentParser(description='Play Pac-Man.')
+    parser.add_argument('--profile', default=PROFILE, metavar='PATH',
+                        help='time each frame phase and write p50/p95/p99 to PATH (.json or .csv) on exit')
+    parser.add_argument('--profile-overlay', action='store_true', default=PROFILE_OVERLAY,
+                        help='show the phase timings on screen (implies profiling)')
+    parser.add_argument('--record', default=RECORD, metavar='PATH',
+                        help='record every input to PATH on exit (replay it with python -m structures.replay)')
+    args = parser.parse_args(argv)
+
+    profiling = not args.profile is None or args.profile_overlay
+    prof = FrameProfiler(PHASES) if profiling else NullProfiler()
+    AGENT_IMGS, DRAW, CLOCK_TICK, PRESENT, SIM, SFX, EVENTS = range(len(PHASES))
         
     game = Game()
     game.init()
-    game.play_start = game.start_sound.play()
+    if not args.record is None:
+        game.sim.input_log = []
+    game.audio.play('start_up')
 
     while game.running:
 
+        prof.begin_frame()
+
         game.update_agent_imgs()
+        prof.lap(AGENT_IMGS)
         game.draw_game_objects()
 
         if not game.playing and game.death_end != -1:
             game.draw_game_over()
+        prof.lap(DRAW)
 
         game.clock.tick(game.frame_rate)
-        game.nframes += 1
-        pygame.display.flip()
+        prof.lap(CLOCK_TICK)
+        game.present()
+        prof.lap(PRESENT)
 
-        if game.play_start.is_playing():
-            game.play_start.wait_done()
-
-        # SFX
-        if game.playing and not game.play_siren.is_playing():
-            game.play_siren = game.sirens[game.next_siren_change].play()
-        if not game.playing and game.play_siren.is_playing():
-            game.play_siren.stop()
-        if game.next_siren_change < len(game.siren_changes) \
-            and game.nframes >= game.siren_changes[game.next_siren_change]*game.frame_rate:
-            game.play_siren.stop()
-            game.next_siren_change += 1
-            game.play_siren = game.sirens[game.next_siren_change].play()
-        if game.pacman.eating and not game.play_waka.is_playing():
-            game.play_waka = game.waka.play()
-        elif not game.pacman.eating and game.play_waka.is_playing():
-            game.play_waka.stop()
+        # hold the game (but keep drawing and handling events) until the start jingle is done
+        if game.audio.is_playing('start_up'):
+            game.handle_events()
+            prof.lap(EVENTS)
+            prof.end_frame()
+            continue
 
         # GAME LOGIC
-        if game.playing:
-            game.pacman.update_pos(game.maze)
-
-            if game.get_mode() == GhostMode.CHASE:
-                game.blinky.target = game.pacman.list_pos
-                game.pinky.target = pos.ListCoord(coord=game.pacman.pos+game.pacman.speed_vec*4)
-            else:
-                game.blinky.target = pos.ListCoord(game.maze.ncols-1, -1)
-                game.pinky.target = pos.ListCoord(0, -1)
-
-            game.blinky.update_speed(game.maze)
-            game.blinky.move(game.maze)
-            game.pinky.update_speed(game.maze)
-            game.pinky.move(game.maze, correct_pos=(not game.pinky.at_home))
-            game.inky.update_speed(game.maze)
-            game.inky.move(game.maze, correct_pos=(not game.inky.at_home))
-
-            if game.next_mode_change < len(game.mode_changes) \
-                and game.nframes >= game.frame_rate*game.mode_changes[game.next_mode_change]:
-                game.mode_ind = (game.mode_ind+1) % 2
-                game.next_mode_change += 1
-            if game.blinky.pos.dist_from(game.pacman.pos) <= 0.5 \
-                or game.pinky.pos.dist_from(game.pacman.pos) <= 0.5:
-                game.start_death_sequence()
+        game.sim.step(game.next_input)
+        game.next_input = None
+
+        if not game.playing and game.death_start == -1:
+            game.start_death_sequence()
+        prof.lap(SIM)
+
+        # SFX
+        game.update_sfx()
+        prof.lap(SFX)
 
         game.handle_events()
+        prof.lap(EVENTS)
+        prof.end_frame()
+
+        if args.profile_overlay and prof.nframes % game.frame_rate == 0:
+            game.set_overlay(prof.get_stats())
+    
+    game.audio.quit()
+
+    if not args.profile is None:
+        prof.dump(args.profile)
+    if not args.record is None:
+        save_replay(args.record, game.sim)
 
 if __name__ == '__main__':
     main()
\ No newline at end of file
@@ -0,0 +1,146 @@
+#!/usr/bin/env python
+"""
+Builds every derived sound in sfx/ from the originals in sfx/wgot/. Each output is described by a recipe
+in RECIPES and is only rebuilt when its recipe, one of its source files or the output itself changed since
+the last build (tracked by content hash in build_manifest.json). Stale outputs are built in parallel.
+
+    python sfx/build.py [--force] [--jobs N] [name ...]
+"""
+import os
+import sys
+import json
+import hashlib
+import argparse
+from functools import reduce
+from concurrent.futures import ProcessPoolExecutor
+
+SCRIPT_DIR = os.path.abspath(os.path.dirname(__file__))
+SOURCE_DIR = os.path.join(SCRIPT_DIR, 'wgot')
+MANIFEST_PATH = os.path.join(SCRIPT_DIR, 'build_manifest.json')
+
+# A clip is one of {'source': <wgot file name>}, {'pause': <ms of silence>} or {'parts': [<clip>, ...]}
+# (concatenated), optionally followed by, in this order:
+#     'gain'   -- dB to add
+#     'slice'  -- [start ms, end ms], either end None to keep everything on that side
+#     'repeat' -- number of times to play it back to back
+RECIPES = {
+    'start_up': {'source': 'game_start', 'gain': 9},
+    'siren_1': {'source': 'siren_1', 'gain': 9},
+    'siren_2': {'source': 'siren_2', 'gain': 9, 'slice': [500, 1215], 'repeat': 4},
+    'siren_3': {'source': 'siren_3', 'gain': 9, 'slice': [500, 1180], 'repeat': 4},
+    'siren_4': {'source': 'siren_4', 'gain': 9},
+    'siren_5': {'source': 'siren_5', 'gain': 9},
+    'waka': {'parts': [{'source': 'munch_1', 'gain': 9}, {'pause': 80},
+                       {'source': 'munch_2', 'gain': 9}, {'pause': 80}],
+             'repeat': 8},
+    'death': {'parts': [{'source': 'death_1', 'gain': 4, 'slice': [None, 1350]},
+                        {'parts': [{'source': 'death_2', 'gain': 4}, {'pause': 10}], 'repeat': 2}],
+              'gain': 5},
+}
+
+def get_sources(clip: dict) -> list[str]:
+    """Every wgot file a clip reads, in order of first use."""
+
+    if 'source' in clip:
+        return [clip['source']]
+
+    sources = []
+    for part in clip.get('parts', []):
+        sources += [s for s in get_sources(part) if not s in sources]
+
+    return sources
+
+def hash_file(path: os.PathLike) -> str:
+
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+def get_input_hash(name: str) -> str:
+    """Hash of an output's recipe and the contents of every source it reads."""
+
+    key = hashlib.sha256(json.dumps(RECIPES[name], sort_keys=True).encode())
+    for source in get_sources(RECIPES[name]):
+        key.update(hash_file(os.path.join(SOURCE_DIR, source + '.wav')).encode())
+
+    return key.hexdigest()
+
+def render(clip: dict):
+    """Arguments: clip (dict) -- see RECIPES. Returns: (AudioSegment) the rendered clip."""
+
+    from pydub import AudioSegment # only needed when something actually has to be rebuilt
+
+    if 'source' in clip:
+        seg = AudioSegment.from_file(os.path.join(SOURCE_DIR, clip['source'] + '.wav'), format='wav')
+    elif 'pause' in clip:
+        seg = AudioSegment.silent(duration=clip['pause'])
+    else:
+        seg = reduce(lambda a, b: a + b, [render(part) for part in clip['parts']])
+
+    if 'gain' in clip:
+        seg = seg + clip['gain']
+    if 'slice' in clip:
+        seg = seg[clip['slice'][0]:clip['slice'][1]]
+    if 'repeat' in clip:
+        seg = seg * clip['repeat']
+
+    return seg
+
+def build(name: str) -> tuple[str, str]:
+    """Render one output to sfx/<name>.wav. Returns the name and the new output's hash."""
+
+    path = os.path.join(SCRIPT_DIR, name + '.wav')
+    render(RECIPES[name]).export(path, format='wav')
+
+    return name, hash_file(path)
+
+def get_stale(names: list[str], manifest: dict) -> list[str]:
+    """Outputs whose recipe or sources changed, or whose wav is missing or was changed by hand."""
+
+    stale = []
+    for name in names:
+        path = os.path.join(SCRIPT_DIR, name + '.wav')
+        entry = manifest.get(name, {})
+        if entry.get('inputs') != get_input_hash(name) or not os.path.exists(path) \
+            or entry.get('output') != hash_file(path):
+            stale.append(name)
+
+    return stale
+
+def main():
+
+    parser = argparse.ArgumentParser(description='Rebuild the derived sounds in sfx/ that are out of date.')
+    parser.add_argument('names', nargs='*', help='outputs to consider (default: all of RECIPES)')
+    parser.add_argument('--force', action='store_true', help='rebuild even if up to date')
+    parser.add_argument('--jobs', type=int, default=None, help='worker processes (default: one per CPU)')
+    args = parser.parse_args()
+
+    names = args.names or list(RECIPES)
+    unknown = [name for name in names if not name in RECIPES]
+    if unknown:
+        sys.exit(f'No recipe for {", ".join(unknown)}.')
+
+    manifest = {}
+    if os.path.exists(MANIFEST_PATH):
+        with open(MANIFEST_PATH) as f:
+            manifest = json.load(f)
+
+    stale = names if args.force else get_stale(names, manifest)
+    if not stale:
+        print('sfx up to date')
+        return
+
+    if len(stale) == 1 or args.jobs == 1:
+        results = [build(name) for name in stale]
+    else:
+        with ProcessPoolExecutor(max_workers=args.jobs) as pool:
+            results = list(pool.map(build, stale))
+
+    for name, output in results:
+        manifest[name] = {'inputs': get_input_hash(name), 'output': output}
+        print(f'built {name}.wav')
+
+    with open(MANIFEST_PATH, 'w') as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+
+if __name__ == '__main__':
+    main()
@@ -1,6 +1,5 @@
 #!/usr/bin/env python
 import os
-from pygame.image import load
 import math
 
 from structures.maze import *
@@ -30,9 +29,19 @@ class Agent:
 
         self.passable_tiles = list(Tile)
     
+    @property
+    def passable_tiles(self) -> list[Tile]:
+        return self._passable_tiles
+    
+    @passable_tiles.setter
+    def passable_tiles(self, tiles: list[Tile]) -> None:
+        # reassign (rather than mutate) the list so the packed bits used for mask lookups stay in sync
+        self._passable_tiles = tiles
+        self.passable_bits = get_tile_bits(tiles)
+    
     def move(self, maze: Maze, speed_vec: FloatCoord, speed_norm: float, correct_pos: bool = True) -> None:
 
-        self.pos += (speed_vec*speed_norm)
+        self.pos.iadd(speed_vec, speed_norm)
         self.pos.wrap(maze.ncols+0.5, maze.nrows, -0.5, 0)
 
         speed_dir = speed_vec.get_direction()
@@ -49,17 +58,22 @@ class Agent:
             self.list_pos.x = math.ceil(self.pos.x)
             if correct_pos: self.pos.y = self.list_pos.y
     
+    def get_open(self, maze: Maze) -> int:
+        """Open-direction mask (see maze.OPEN_BITS) of the tile this agent is on."""
+
+        return maze.get_open_rc(self.list_pos.y, self.list_pos.x, self.passable_bits)
+    
     def can_move(self, maze: Maze, speed: FloatCoord):
 
-        return maze.get_tile(self.list_pos.get_adj(speed.get_direction())) in self.passable_tiles
+        return self.get_open(maze) & OPEN_BITS.get(speed.get_direction(), 0) != 0
 
     def get_center(self):
 
-        return self.pos + FloatCoord(0.5, 0.5)
+        return self.pos + HALF
     
     def get_tl(self):
 
-        return self.pos - FloatCoord(0.5, 0.5)
+        return self.pos - HALF
 
 class Player(Agent):
 
@@ -78,14 +92,17 @@ class Player(Agent):
         self.eating = False
         self.last_dot = ListCoord(0,0)
 
-        self.mimages = sorted([d for d in os.listdir(gfx_path) if '-m' in d])
-        self.mimages = [load(os.path.join(gfx_path, img)) for img in self.mimages]
-        self.dimages = sorted([d for d in os.listdir(gfx_path) if '-d' in d])
-        self.dimages = [load(os.path.join(gfx_path, img)) for img in self.dimages]
+        # frames live on a shared sheet, pre-rotated for every direction so drawing never has to transform
+        self.sheet, self.mnames, self.dnames = None, [], []
+        if not gfx_path is None: # headless agents (gfx_path=None) carry no images (and never import pygame)
+            from structures.assets import get_sheet
+            self.sheet = get_sheet(gfx_path, angles=[get_dir_angle(dir) for dir in OPEN_DIRS])
+            self.mnames = [name for name in self.sheet.names if '-m' in name]
+            self.dnames = [name for name in self.sheet.names if '-d' in name]
 
         self.next_speed = None
         self.is_moving = False
-        self.passable_tiles = [Tile.EMPTY, Tile.DOT]
+        self.passable_tiles = list(PLAYER_TILES)
     
     def move(self, maze: Maze) -> None:
         super().move(maze, self.speed_vec, self.speed_norm)
@@ -112,18 +129,29 @@ class Player(Agent):
             self.is_moving = False
             self.eating = False
     
-    def get_move_image(self, nframes):
+    @property
+    def mimages(self) -> list:
+        return [self.sheet.get(name) for name in self.mnames]
+    
+    @property
+    def dimages(self) -> list:
+        return [self.sheet.get(name) for name in self.dnames]
+    
+    def get_move_image(self, nframes, dir: Direction = None):
+        """Current chomp frame, taken from the pre-rotated set facing dir when one is given."""
 
-        if not self.is_moving: return self.mimages[-1]
+        ind = (nframes // self.chomp_rate) % len(self.mnames) if self.is_moving else len(self.mnames)-1
 
-        return self.mimages[(nframes // self.chomp_rate) % len(self.mimages)]
+        return self.sheet.get(self.mnames[ind], 0 if dir is None else get_dir_angle(dir))
     
-    def get_death_image(self, nframes, death_start):
+    def get_death_image(self, nframes, death_start, dir: Direction = None):
+        """Current death frame (pre-rotated to face dir when one is given), or None once it has played out."""
 
-        if (nframes-death_start) // self.death_rate < len(self.dimages):
-            return self.dimages[(nframes-death_start) // self.death_rate]
+        ind = (nframes-death_start) // self.death_rate
+        if ind >= len(self.dnames):
+            return None
         
-        return None
+        return self.sheet.get(self.dnames[ind], 0 if dir is None else get_dir_angle(dir))
 
 class Enemy(Agent):
 
@@ -140,8 +168,9 @@ class Enemy(Agent):
         self.at_home = True
         self.waiting = True
         self.slow_norm = speed_norm*speed_reduction
-        self.passable_tiles = [Tile.EMPTY, Tile.DOT, Tile.GHOST_WALL, Tile.OOB]
+        self.passable_tiles = list(HOME_TILES)
         self.last_turn_pos = ListCoord(0,0)
+        self.dist_metric = EUCLID_SQ
         
         if isinstance(target, ListCoord):
             self.target = target
@@ -151,15 +180,21 @@ class Enemy(Agent):
             raise TypeError('Invalid argument for target passed to Enemy constructor.')
 
         self.gfx_path = gfx_path
-        imgs = sorted(os.listdir(gfx_path))
-        self.images = [(os.path.join(gfx_path, imgs[2*i]), os.path.join(gfx_path, imgs[2*i+1])) 
-                       for i in range(len(imgs)//2)]
-        self.images = [(load(w0), load(w1)) for w0, w1 in self.images]
+        self.sheet, self.names = None, []
+        if not gfx_path is None: # headless agents (gfx_path=None) carry no images (and never import pygame)
+            from structures.assets import get_sheet
+            # frames are named a<angle>_w<wave>; group the waves of each angle in angle order
+            self.sheet = get_sheet(gfx_path)
+            angles = {}
+            for name in self.sheet.names:
+                angle, _ = name.split('_')
+                angles.setdefault(int(angle[1:]), []).append(name)
+            self.names = [tuple(angles[a]) for a in sorted(angles)]
         self.wave_rate = 6
 
     def move(self, maze: Maze, correct_pos: bool = True) -> None:
 
-        if self.list_pos.y == 14 and (self.list_pos.x < 6 or self.list_pos.x >= maze.ncols-6):
+        if maze.in_tunnel_rc(self.list_pos.y, self.list_pos.x):
             super().move(maze, self.speed_vec, self.slow_norm, correct_pos=correct_pos)
         elif self.waiting:
             super().move(maze, self.speed_vec, self.slow_norm, correct_pos=correct_pos)
@@ -168,7 +203,7 @@ class Enemy(Agent):
     
     def get_turns(self, maze: Maze):
 
-        return [d for d in list(Direction)[::2] if self.can_move(maze, FloatCoord(dir=d))]
+        return list(OPEN_TURNS[self.get_open(maze)])
     
     def update_speed(self, maze: Maze):
 
@@ -182,36 +217,32 @@ class Enemy(Agent):
             #     self.pos += self.speed_vec*self.slow_norm
             # elif not self.waiting:
             #     self.speed_vec = FloatCoord(dir=Direction.N)
-            if self.list_pos.x == maze.ncols//2 - 1 and self.list_pos.y == 11:
+            if not maze.exit is None and self.list_pos == maze.exit:
                 self.at_home = False
-                self.passable_tiles = [Tile.EMPTY, Tile.DOT]
+                self.passable_tiles = list(GHOST_TILES)
 
         if not self.at_home:
-            turns = self.get_turns(maze)
-            if (not self.can_move(maze, self.speed_vec) or len(turns) > 2) \
+            open_dirs = self.get_open(maze)
+            heading = self.speed_vec.get_direction()
+            if (not open_dirs & OPEN_BITS.get(heading, 0) or open_dirs & JUNCTION) \
                 and not self.list_pos == self.last_turn_pos:
 
-                mindist = maze.nrows+maze.ncols+1
-                best_turn = self.speed_vec.get_direction()
-                for turn in turns:
-
-                    if turn != get_reverse(self.speed_vec.get_direction()):
-                        curdist = self.list_pos.get_adj(turn).dist_from(self.target)
-
-                        if curdist < mindist:
-                            mindist = curdist
-                            best_turn = turn
-            
-                self.speed_vec = FloatCoord(dir=best_turn)
-                self.last_turn_pos = ListCoord(v=self.list_pos.get_tuple())
+                best_turn = maze.get_turn(self.list_pos, heading, self.target, self.passable_bits,
+                                          metric=self.dist_metric)
+                self.speed_vec = DIR_COORDS[best_turn]
+                self.last_turn_pos.x, self.last_turn_pos.y = self.list_pos.x, self.list_pos.y
+    
+    @property
+    def images(self) -> list:
+        return [tuple(self.sheet.get(name) for name in pair) for pair in self.names]
     
     def get_image(self, nframes, start_frame):
 
         if nframes < start_frame:
-            return self.images[0][0]
+            return self.sheet.get(self.names[0][0])
 
         angle_ind = get_dir_angle(self.speed_vec.get_direction()) // 90
-        angle_pair = self.images[angle_ind]
+        angle_pair = self.names[angle_ind]
         wave = (nframes // self.wave_rate) % len(angle_pair)
         
-        return angle_pair[wave]
+        return self.sheet.get(angle_pair[wave])
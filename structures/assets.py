@@ -0,0 +1,121 @@
+#!/usr/bin/env python
+import os
+from typing import Iterable
+
+import pygame
+
+class SpriteSheet:
+    """
+    All the sprites in one gfx directory (plus any rotated variants asked for) packed into a single
+    atlas surface. Frames are subsurfaces of the atlas looked up by (name, angle), where name is the
+    file name without its extension.
+
+    Sheets are shared between every agent using the same directory, so get them through get_sheet()
+    rather than constructing one directly, and look frames up through get() when drawing: convert()
+    repacks the atlas and replaces every frame surface.
+    """
+
+    def __init__(self, path: os.PathLike) -> None:
+
+        self.path = path
+        self.names = sorted(os.path.splitext(f)[0] for f in os.listdir(path) if f.endswith('.png'))
+        self.images = {name: pygame.image.load(os.path.join(path, name+'.png')) for name in self.names}
+
+        self.angles = [0]
+        self.converted = False
+        self.atlas = None
+        self.rects, self.frames = {}, {}
+
+        self.convert()
+        self._pack()
+
+    def _pack(self) -> None:
+        # one shelf per sprite, one column per angle
+        variants = {(name, angle): pygame.transform.rotate(self.images[name], angle) if angle else self.images[name]
+                    for name in self.names for angle in self.angles}
+
+        width, height = 0, 0
+        self.rects = {}
+        for name in self.names:
+            x, shelf = 0, 0
+            for angle in self.angles:
+                w, h = variants[(name, angle)].get_size()
+                self.rects[(name, angle)] = pygame.Rect(x, height, w, h)
+                x += w
+                shelf = max(shelf, h)
+            width = max(width, x)
+            height += shelf
+
+        self.atlas = pygame.Surface((max(width, 1), max(height, 1)), pygame.SRCALPHA)
+        if self.converted:
+            self.atlas = self.atlas.convert_alpha()
+        for key, rect in self.rects.items():
+            self.atlas.blit(variants[key], rect, special_flags=pygame.BLEND_RGBA_MAX) # exact copy onto the clear atlas
+
+        self.frames = {key: self.atlas.subsurface(rect) for key, rect in self.rects.items()}
+
+    def add_angles(self, angles: Iterable[int]) -> None:
+        """Add pre-rotated variants of every sprite (angles in degrees, counter-clockwise)."""
+
+        new_angles = [a for a in angles if not a in self.angles]
+        if new_angles:
+            self.angles += new_angles
+            self._pack()
+
+    def convert(self) -> bool:
+        """
+        Convert the sprites to the display's pixel format (once a display mode has been set) and
+        repack the atlas. Returns whether the sheet is converted.
+        """
+
+        if self.converted or pygame.display.get_surface() is None:
+            return self.converted
+
+        self.images = {name: img.convert_alpha() for name, img in self.images.items()}
+        self.converted = True
+        if not self.atlas is None:
+            self._pack()
+
+        return self.converted
+
+    def get(self, name: str, angle: int = 0) -> pygame.Surface:
+
+        return self.frames[(name, angle)]
+
+# process-wide sheets keyed by directory
+SHEETS = {}
+
+def get_sheet(path: os.PathLike, angles: Iterable[int] = (0,)) -> SpriteSheet:
+    """
+    Arguments:
+        path (PathLike)        -- directory holding the sprite pngs
+        angles (Iterable[int]) -- (optional; default=(0,)) rotations the caller will look frames up by
+
+    Returns:
+        The shared SpriteSheet for path, loading it from disk on first use only.
+    """
+
+    key = os.path.realpath(path)
+    if not key in SHEETS:
+        SHEETS[key] = SpriteSheet(path)
+
+    SHEETS[key].add_angles(angles)
+
+    return SHEETS[key]
+
+def convert_sheets() -> None:
+    """Convert every loaded sheet to the display format. Call once pygame.display.set_mode has run."""
+
+    for sheet in SHEETS.values():
+        sheet.convert()
+
+def main():
+    print('You are runnning assets.py as a python script')
+
+    gfx_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'gfx')
+    for name in ('pacman', 'blinky', 'pinky', 'inky', 'clyde'):
+        sheet = get_sheet(os.path.join(gfx_path, name))
+        print(f'{name}: {len(sheet.frames)} frames in a {sheet.atlas.get_size()} atlas')
+
+if __name__ == '__main__':
+    main()
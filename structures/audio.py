@@ -0,0 +1,196 @@
+#!/usr/bin/env python
+import os
+import math
+import time
+import wave
+import queue
+import threading
+
+import pygame
+
+# event kinds posted to the audio thread
+PLAY, LOOP, STOP, STOP_ALL = 'play', 'loop', 'stop', 'stop_all'
+
+def decode_wav(path: os.PathLike) -> tuple[bytes, int, int, int]:
+    """Returns the raw PCM frames of a wav file and its (channels, sample width, sample rate)."""
+
+    with wave.open(path, 'rb') as w:
+        return w.readframes(w.getnframes()), w.getnchannels(), w.getsampwidth(), w.getframerate()
+
+def convert_pcm(pcm: bytes, src: tuple[int, int, int], dst: tuple[int, int, int]) -> bytes:
+    """
+    Arguments:
+        pcm (bytes) -- raw PCM frames as returned by decode_wav
+        src, dst    -- (channels, sample width, sample rate) of pcm and of the wanted output
+
+    Returns:
+        pcm in the dst format (8-bit samples are unsigned, as in wav files). Raises ValueError if it
+        needs converting and can't be (audioop missing, or more than two channels).
+    """
+
+    if src == dst:
+        return pcm
+
+    try:
+        import audioop # only needed for sfx that don't match the mixer; gone from python 3.13
+    except ImportError:
+        raise ValueError(f'Sound in format {src} does not match the mixer format {dst}.')
+
+    (nchannels, width, rate), (dst_channels, dst_width, dst_rate) = src, dst
+    if max(nchannels, dst_channels) > 2:
+        raise ValueError(f'Cannot convert sound from {nchannels} to {dst_channels} channels.')
+
+    if width == 1:
+        pcm = audioop.bias(pcm, 1, -128) # audioop works on signed samples
+    if nchannels == 2 and dst_channels == 1:
+        pcm = audioop.tomono(pcm, width, 0.5, 0.5)
+    elif nchannels == 1 and dst_channels == 2:
+        pcm = audioop.tostereo(pcm, width, 1, 1)
+    if width != dst_width:
+        pcm = audioop.lin2lin(pcm, width, dst_width)
+    if rate != dst_rate:
+        pcm, _ = audioop.ratecv(pcm, dst_width, dst_channels, rate, dst_rate, None)
+    if dst_width == 1:
+        pcm = audioop.bias(pcm, 1, 128)
+
+    return pcm
+
+class Audio:
+    """
+    Sound effects for the game. Every wav in sfx_path is decoded into memory once by init(); after that
+    the game thread only posts events (play, loop, stop) that a dedicated thread applies to the mixer,
+    and SDL mixes on its own callback thread. None of the calls here ever block on the audio device.
+
+    If the mixer can't be opened (no audio device, a sound convert_pcm can't convert, or enabled=False)
+    everything still works silently: loops are tracked as playing and one-shots finish immediately, so
+    nothing ever waits on them.
+    """
+
+    def __init__(self, sfx_path: os.PathLike, enabled: bool = True) -> None:
+
+        self.sfx_path = sfx_path
+        self.enabled = enabled
+        self.initialized = False
+
+        self.pcm, self.lengths = {}, {}
+        self.sounds, self.channels = {}, {}
+        self.ends = {} # monotonic time each sound stops playing, math.inf while looping
+
+        self.events = queue.SimpleQueue()
+        self.thread = None
+
+    def init(self) -> None:
+
+        for fname in sorted(os.listdir(self.sfx_path)):
+            if fname.endswith('.wav'):
+                pcm, nchannels, width, rate = decode_wav(os.path.join(self.sfx_path, fname))
+                name = os.path.splitext(fname)[0]
+                self.pcm[name] = (pcm, nchannels, width, rate)
+                self.lengths[name] = len(pcm) / (nchannels*width*rate)
+
+        if self.enabled and self.pcm:
+            # open the mixer in the sfx' own format so the decoded buffers can be handed over as-is;
+            # any file in another format is converted to it first
+            fmt = next(iter(self.pcm.values()))[1:]
+            nchannels, width, rate = fmt
+            try:
+                pygame.mixer.quit() # pygame.init() may already have opened it in another format
+                # 8-bit wavs are unsigned, wider ones signed
+                pygame.mixer.init(frequency=rate, size=8 if width == 1 else -8*width, channels=nchannels,
+                                  allowedchanges=0)
+                pygame.mixer.set_num_channels(len(self.pcm))
+                for i, (name, (pcm, *src)) in enumerate(self.pcm.items()):
+                    self.sounds[name] = pygame.mixer.Sound(buffer=convert_pcm(pcm, tuple(src), fmt))
+                    self.channels[name] = pygame.mixer.Channel(i)
+            except (pygame.error, ValueError): # no device, or sfx convert_pcm can't bring to the mixer format
+                pygame.mixer.quit()
+                self.sounds, self.channels = {}, {}
+
+        self.thread = threading.Thread(target=self._run, name='audio', daemon=True)
+        self.thread.start()
+        self.initialized = True
+
+    def is_silent(self) -> bool:
+        return not self.sounds
+
+    def _run(self) -> None:
+
+        while True:
+            event = self.events.get()
+            if event is None:
+                return
+
+            kind, name = event
+            if self.is_silent():
+                continue
+
+            if kind == PLAY:
+                self.channels[name].play(self.sounds[name])
+            elif kind == LOOP:
+                self.channels[name].play(self.sounds[name], loops=-1)
+            elif kind == STOP:
+                self.channels[name].stop()
+            elif kind == STOP_ALL:
+                pygame.mixer.stop()
+
+    def _post(self, kind: str, name: str = None) -> None:
+
+        if not self.initialized:
+            raise RuntimeError('Audio not yet initialized, sound events unavailable.')
+
+        self.events.put((kind, name))
+
+    def play(self, name: str) -> None:
+        """Play a sound once from the start."""
+
+        self.ends[name] = time.monotonic() + (0 if self.is_silent() else self.lengths[name])
+        self._post(PLAY, name)
+
+    def loop(self, name: str) -> None:
+        """Play a sound from the start, repeating until stopped."""
+
+        self.ends[name] = math.inf
+        self._post(LOOP, name)
+
+    def stop(self, name: str) -> None:
+
+        self.ends[name] = 0
+        self._post(STOP, name)
+
+    def stop_all(self) -> None:
+
+        self.ends.clear()
+        self._post(STOP_ALL)
+
+    def is_playing(self, name: str) -> bool:
+        """Whether a sound was started and hasn't ended or been stopped. Never queries the device."""
+
+        return self.ends.get(name, 0) > time.monotonic()
+
+    def quit(self) -> None:
+        """Stop every sound, shut the audio thread down and close the mixer."""
+
+        if not self.initialized:
+            return
+
+        self.stop_all()
+        self.events.put(None)
+        self.thread.join()
+        if not self.is_silent():
+            pygame.mixer.quit()
+        self.initialized = False
+
+def main():
+    print('You are runnning audio.py as a python script')
+
+    audio = Audio(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'sfx'))
+    audio.init()
+    print(f'decoded {len(audio.pcm)} sounds, {"silent" if audio.is_silent() else "mixer open"}')
+
+    audio.play('start_up')
+    while audio.is_playing('start_up'):
+        time.sleep(0.1)
+    audio.quit()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,363 @@
+#!/usr/bin/env python
+import numpy as np
+
+from structures.maze import *
+from structures.position import *
+from structures.sim import Simulation
+
+# direction indices follow the maze's open-direction bits (E, N, W, S), with one extra slot for
+# "no direction" so that index arrays never need special-casing
+DIR_INDEX = {d: i for i, d in enumerate(OPEN_DIRS)}
+NO_DIR = len(OPEN_DIRS)
+DIR_VECS = np.array(OPEN_VECS + [(0, 0)], dtype=np.int64)
+REVERSE = np.array([DIR_INDEX[get_reverse(d)] for d in OPEN_DIRS] + [NO_DIR], dtype=np.int64)
+
+# passable-tile sets: the player, a ghost outside the house and a ghost inside the house
+PLAYER, GHOST, HOME = 0, 1, 2
+PASSABLE_SETS = (PLAYER_TILES, GHOST_TILES, HOME_TILES)
+IS_HORIZ, IS_VERT = DIR_VECS[:, 0] != 0, DIR_VECS[:, 1] != 0
+ROUND_SIGN = np.where(DIR_VECS.sum(axis=1) < 0, -1.0, 1.0)
+POPCOUNT = np.array([bin(i).count('1') for i in range(1 << NO_DIR)], dtype=np.int64)
+
+# agent slots along axis 1 of the agent arrays
+PACMAN, BLINKY, PINKY, INKY = 0, 1, 2, 3
+
+def get_dirs(speed: np.ndarray) -> np.ndarray:
+    """Vectorized FloatCoord.get_direction over an (..., 2) array. Returns indices into DIR_VECS."""
+
+    x, y = speed[..., 0], speed[..., 1]
+    dirs = np.full(x.shape, NO_DIR, dtype=np.int64)
+    dirs[(x > 0) & (y == 0)] = DIR_INDEX[Direction.E]
+    dirs[(x == 0) & (y < 0)] = DIR_INDEX[Direction.N]
+    dirs[(x < 0) & (y == 0)] = DIR_INDEX[Direction.W]
+    dirs[(x == 0) & (y > 0)] = DIR_INDEX[Direction.S]
+
+    return dirs
+
+def get_in_tunnel(list_pos: np.ndarray, tunnel_rows: dict) -> np.ndarray:
+    """Vectorized Maze.in_tunnel_rc over an (n, 2) array of list positions, for a maze's tunnel_rows."""
+
+    in_tunnel = np.zeros(len(list_pos), dtype=bool)
+    for row, (left, right) in tunnel_rows.items():
+        in_tunnel |= (list_pos[:, 1] == row) & ((list_pos[:, 0] < left) | (list_pos[:, 0] >= right))
+
+    return in_tunnel
+
+def move_agents(pos: np.ndarray, list_pos: np.ndarray, speed: np.ndarray, dirs: np.ndarray, norm: np.ndarray,
+                correct_pos, active: np.ndarray, nrows: int, ncols: int) -> None:
+    """
+    Vectorized Agent.move over (n, 2) position/list position/speed arrays (updated in place, views are
+    fine) with their (n,) direction indices and speed norms. Only the active agents move.
+    """
+
+    horiz, vert = IS_HORIZ[dirs], IS_VERT[dirs]
+
+    x = pos[:, 0] + speed[:, 0]*norm
+    y = pos[:, 1] + speed[:, 1]*norm
+    # Coord.wrap; the shifted values are never negative, so fmod matches python's %
+    xmax, ymax, xmin, ymin = ncols+0.5, nrows, -0.5, 0
+    x = np.fmod((x-xmin) + (xmax-xmin), xmax-xmin) + xmin
+    y = np.fmod((y-ymin) + (ymax-ymin), ymax-ymin) + ymin
+
+    # only the axis of travel is rounded: ceil going N/W, floor going S/E (ceil(v) = -floor(-v))
+    sign = ROUND_SIGN[dirs]
+    rounded = (sign*np.floor(sign*np.where(horiz, x, y))).astype(np.int64)
+    list_x = np.where(horiz, rounded, list_pos[:, 0])
+    list_y = np.where(vert, rounded, list_pos[:, 1])
+    x = np.where(vert & correct_pos, list_x, x)
+    y = np.where(horiz & correct_pos, list_y, y)
+
+    np.copyto(pos[:, 0], x, where=active)
+    np.copyto(pos[:, 1], y, where=active)
+    np.copyto(list_pos[:, 0], list_x, where=active)
+    np.copyto(list_pos[:, 1], list_y, where=active)
+
+def get_best_turns(list_pos: np.ndarray, dirs: np.ndarray, open_dirs: np.ndarray, target: np.ndarray,
+                   nrows: int, ncols: int) -> np.ndarray:
+    """
+    Vectorized Maze.get_turn (EUCLID_SQ) for ghosts deciding at a tile: (n, 2) list positions and
+    targets, (n,) headings and open-direction masks (junction bit cleared). Returns the chosen headings.
+    """
+
+    adj = list_pos[:, None, :] + DIR_VECS[None, :NO_DIR]
+    dist = ((adj - target[:, None, :])**2).sum(axis=2)
+
+    # squared distances order exactly like the scalar sqrt distances; argmin keeps the
+    # first strictly-smaller candidate in turn order
+    maxdist = (nrows+ncols+1)**2
+    candidates = ((open_dirs[:, None] >> np.arange(NO_DIR)) & 1 == 1) \
+        & (np.arange(NO_DIR)[None] != REVERSE[dirs][:, None])
+    dist = np.where(candidates, dist, maxdist)
+    best = np.argmin(dist, axis=1)
+
+    return np.where(dist[np.arange(len(dirs)), best] < maxdist, best, dirs)
+
+class BatchSimulation:
+    """
+    N independent games stepped together. Tiles live in one (N, nrows, ncols) uint8 array and the
+    agents (pacman, blinky, pinky, inky) in (N, 4, 2) position/speed arrays; every rule from
+    Agent.move, Player.update_pos and Enemy.update_speed is applied to all games at once.
+
+    Starting state is copied from a headless Simulation so both always begin from the same board.
+
+    Tunnels and the house exit are taken from the Simulation's maze (Maze.tunnel_rows, Maze.exit).
+
+    Known limitation: this misses the 100x-per-core target. It runs about 25-45x a scalar
+    Simulation.step, and only about 25x at 1,000 games. On one core a frame costs about 1.3-1.6 us per
+    game at 1,000 games and 0.8-1.6 us at 10,000. A scalar step costs 35-40 us. Every rule is a NumPy
+    pass over the games, so the cost is bound by the number of passes per frame. Batching the three
+    ghosts into one pass and vectorizing the collision test did not lower it.
+    """
+
+    def __init__(self, ngames: int, frame_rate: int = 60) -> None:
+
+        self.ngames = ngames
+        self.frame_rate = frame_rate
+        self.initialized = False
+
+        self.nrows, self.ncols = 0, 0
+        self.tiles, self.open_dirs = None, None
+        self.tunnel_rows, self.exit = {}, None
+        self.pos, self.list_pos, self.speed, self.heading = None, None, None, None
+        self.speed_norm, self.slow_norm = None, None
+        self.target, self.last_turn = None, None
+        self.at_home, self.waiting = None, None
+
+        self.next_dir = None
+        self.score, self.eating, self.is_moving, self.last_dot = None, None, None, None
+
+        self.mode_changes, self.siren_changes = None, None
+        self.mode_ind, self.next_mode_change = None, None
+        self.next_siren_change = 0
+
+        self.nframes = 0
+        self.playing, self.death_frame = None, None
+
+    def init(self) -> None:
+        """(Re)build every game from the starting state of a headless Simulation."""
+
+        sim = Simulation(frame_rate=self.frame_rate)
+        sim.init()
+        n = self.ngames
+        agents = (sim.pacman, sim.blinky, sim.pinky, sim.inky)
+
+        self.nrows, self.ncols = sim.maze.nrows, sim.maze.ncols
+        grid = np.array(sim.maze.get_view(), dtype=np.uint8)
+        self.tiles = np.repeat(grid[None], n, axis=0)
+        self._tile_offsets = np.arange(n, dtype=np.int64)*self.nrows*self.ncols
+        self.tunnel_rows, self.exit = sim.maze.tunnel_rows, sim.maze.exit
+
+        # Maze's open-direction tables (junction bit dropped); eating a dot never changes
+        # passability, so one table per set serves every game for the whole run
+        shape = (self.nrows+2*OPEN_PAD, self.ncols+2*OPEN_PAD)
+        self.open_dirs = np.stack([np.frombuffer(sim.maze.get_open_dirs(get_tile_bits(t)), dtype=np.uint8)
+                                   for t in PASSABLE_SETS]).reshape(len(PASSABLE_SETS), *shape)
+        self.open_dirs = self.open_dirs.astype(np.int64) & (JUNCTION-1)
+
+        def per_game(values, dtype):
+            values = np.array(values, dtype=dtype)
+            return np.repeat(values[None], n, axis=0)
+
+        self.pos = per_game([a.pos.get_tuple() for a in agents], np.float64)
+        self.list_pos = per_game([a.list_pos.get_tuple() for a in agents], np.int64)
+        self.speed = per_game([a.speed_vec.get_tuple() for a in agents], np.float64)
+        self.heading = get_dirs(self.speed)
+        self.speed_norm = per_game([a.speed_norm for a in agents], np.float64)
+        self.slow_norm = per_game([sim.pacman.speed_norm] + [g.slow_norm for g in agents[1:]], np.float64)
+        self.target = per_game([(0, 0)] + [g.target.get_tuple() for g in agents[1:]], np.int64)
+        self.last_turn = per_game([(0, 0)] + [g.last_turn_pos.get_tuple() for g in agents[1:]], np.int64)
+        self.at_home = per_game([False] + [g.at_home for g in agents[1:]], bool)
+        self.waiting = per_game([False] + [g.waiting for g in agents[1:]], bool)
+
+        self.next_dir = np.full(n, NO_DIR, dtype=np.int64)
+        self.score = np.zeros(n, dtype=np.int64)
+        self.eating = np.zeros(n, dtype=bool)
+        self.is_moving = np.zeros(n, dtype=bool)
+        self.last_dot = per_game(sim.pacman.last_dot.get_tuple(), np.int64)
+
+        self.mode_changes = np.array(sim.mode_changes, dtype=np.float64)
+        self.siren_changes = list(sim.siren_changes)
+        self.mode_ind = np.full(n, sim.mode_ind, dtype=np.int64)
+        self.next_mode_change = np.zeros(n, dtype=np.int64)
+        self.next_siren_change = 0
+
+        self.nframes = 0
+        self.playing = np.ones(n, dtype=bool)
+        self.death_frame = np.full(n, -1, dtype=np.int64)
+        self.initialized = True
+
+    # ================== VECTORIZED MAZE/AGENT RULES ==================
+
+    def _get_tiles(self, c: np.ndarray, r: np.ndarray) -> tuple:
+        """Vectorized Maze.get_tile, one lookup per game. Returns tile codes plus the (possibly
+        tunnel-wrapped) c and r."""
+
+        wrap = get_in_tunnel(np.stack([c, r], axis=1), self.tunnel_rows)
+        c = np.where(wrap, c % self.ncols, c)
+        r = np.where(wrap, r % self.nrows, r)
+        in_bounds = (c >= 0) & (r >= 0) & (c < self.ncols) & (r < self.nrows)
+
+        idx = self._tile_offsets + np.where(in_bounds, r*self.ncols + c, 0)
+        tiles = np.take(self.tiles.reshape(-1), idx)
+
+        return np.where(in_bounds, tiles, TILE_CODES[Tile.OOB]), c, r
+
+    def _get_open(self, list_pos: np.ndarray, sets) -> np.ndarray:
+        """Open-direction bitmasks for an (ngames, 2) array of list positions."""
+
+        _, nrows, ncols = self.open_dirs.shape
+        idx = (sets*nrows + list_pos[:, 1]+OPEN_PAD)*ncols + list_pos[:, 0]+OPEN_PAD
+
+        return np.take(self.open_dirs, idx)
+
+    def _move(self, a: int, norm: np.ndarray, correct_pos, active: np.ndarray) -> None:
+        """Vectorized Agent.move for agent a in the active games."""
+
+        move_agents(self.pos[:, a], self.list_pos[:, a], self.speed[:, a], self.heading[:, a], norm,
+                    correct_pos, active, self.nrows, self.ncols)
+
+    def _update_player(self, active: np.ndarray) -> None:
+        """Vectorized Player.update_pos (including Player.move's dot eating)."""
+
+        open_dirs = self._get_open(self.list_pos[:, PACMAN], PLAYER)
+        turn = active & ((open_dirs >> self.next_dir) & 1 == 1) # NO_DIR's bit is never set
+        ahead = (open_dirs >> self.heading[:, PACMAN]) & 1 == 1
+
+        self.speed[turn, PACMAN] = DIR_VECS[self.next_dir[turn]]
+        self.heading[turn, PACMAN] = self.next_dir[turn]
+        self.next_dir[turn] = NO_DIR
+
+        moving = turn | (active & ahead)
+        np.copyto(self.is_moving, moving, where=active)
+        self.eating[active & ~moving] = False
+
+        self._move(PACMAN, self.speed_norm[:, PACMAN], True, moving)
+
+        # Maze.get_tile wraps the player's list position in place when it is in the tunnel
+        list_pos = self.list_pos[:, PACMAN]
+        tiles, c, r = self._get_tiles(list_pos[:, 0], list_pos[:, 1])
+        np.copyto(list_pos[:, 0], c, where=moving)
+        np.copyto(list_pos[:, 1], r, where=moving)
+
+        dot = moving & (tiles == TILE_CODES[Tile.DOT])
+        dg = np.flatnonzero(dot)
+        self.tiles[dg, r[dg], c[dg]] = TILE_CODES[Tile.EMPTY]
+        self.last_dot[dg] = list_pos[dg]
+        self.score[dg] += 10
+        self.eating[dg] = True
+
+        moved_off = moving & ((list_pos[:, 0] != self.last_dot[:, 0]) | (list_pos[:, 1] != self.last_dot[:, 1]))
+        self.eating[moved_off] = False
+
+    def _update_ghost(self, a: int, active: np.ndarray) -> None:
+        """Vectorized Enemy.update_speed followed by Enemy.move for ghost a in the active games."""
+
+        list_pos = self.list_pos[:, a]
+        dirs = self.heading[:, a]
+
+        # waiting ghosts bounce around inside the house
+        waiting = active & self.at_home[:, a] & self.waiting[:, a]
+        if waiting.any():
+            open_dirs = self._get_open(list_pos, HOME)
+            stuck = waiting & ((open_dirs >> dirs) & 1 == 0)
+            self.speed[stuck, a] *= -1
+            dirs = np.where(stuck, REVERSE[dirs], dirs)
+            self.heading[:, a] = dirs
+
+        if not self.exit is None:
+            leaving = active & self.at_home[:, a] & (list_pos[:, 0] == self.exit.x) & (list_pos[:, 1] == self.exit.y)
+            self.at_home[leaving, a] = False
+
+        # junction steering for ghosts outside the house
+        outside = active & ~self.at_home[:, a]
+        open_dirs = self._get_open(list_pos, GHOST)
+        blocked = (open_dirs >> dirs) & 1 == 0
+        moved = (list_pos[:, 0] != self.last_turn[:, a, 0]) | (list_pos[:, 1] != self.last_turn[:, a, 1])
+        deciding = outside & (blocked | (POPCOUNT[open_dirs] > 2)) & moved
+
+        dg = np.flatnonzero(deciding)
+        if len(dg):
+            best = get_best_turns(list_pos[dg], dirs[dg], open_dirs[dg], self.target[dg, a], self.nrows, self.ncols)
+            self.speed[dg, a] = DIR_VECS[best]
+            self.heading[dg, a] = best
+            self.last_turn[dg, a] = list_pos[dg]
+
+        # Enemy.move
+        slow = get_in_tunnel(list_pos, self.tunnel_rows) | self.waiting[:, a]
+        norm = np.where(slow, self.slow_norm[:, a], self.speed_norm[:, a])
+        self._move(a, norm, ~self.at_home[:, a], active)
+
+    # ================== STEPPING ==================
+
+    def step(self, inputs: np.ndarray = None, n: int = 1) -> np.ndarray:
+        """
+        Arguments:
+            inputs (np.ndarray) -- (optional; default=None) shape (ngames,) array of direction indices
+                                   (DIR_INDEX values, NO_DIR for no change) queued before the first frame
+            n (int)             -- (optional; default=1) number of frames to advance
+
+        Returns:
+            The (ngames,) boolean array of games still being played.
+        """
+
+        if not self.initialized:
+            raise RuntimeError('BatchSimulation not yet initialized, method step unavailable.')
+
+        if not inputs is None:
+            inputs = np.asarray(inputs, dtype=np.int64)
+            self.next_dir = np.where(inputs != NO_DIR, inputs, self.next_dir)
+
+        for _ in range(n):
+            self._step_frame()
+
+        return self.playing
+
+    def _step_frame(self) -> None:
+
+        self.nframes += 1
+
+        if self.next_siren_change < len(self.siren_changes) \
+            and self.nframes >= self.siren_changes[self.next_siren_change]*self.frame_rate:
+            self.next_siren_change += 1
+
+        active = self.playing.copy()
+        if not active.any():
+            return
+
+        self._update_player(active)
+
+        chase = (active & (self.mode_ind == 0))[:, None]
+        scatter = (active & (self.mode_ind != 0))[:, None]
+        pinky_target = (self.pos[:, PACMAN] + self.speed[:, PACMAN]*4).astype(np.int64)
+        np.copyto(self.target[:, BLINKY], self.list_pos[:, PACMAN], where=chase)
+        np.copyto(self.target[:, PINKY], pinky_target, where=chase)
+        np.copyto(self.target[:, BLINKY], (self.ncols-1, -1), where=scatter)
+        np.copyto(self.target[:, PINKY], (0, -1), where=scatter)
+
+        for a in (BLINKY, PINKY, INKY):
+            self._update_ghost(a, active)
+
+        change = active & (self.nframes >= self.frame_rate*self.mode_changes[self.next_mode_change])
+        self.mode_ind[change] = (self.mode_ind[change]+1) % 2
+        self.next_mode_change[change] += 1
+
+        dead = np.zeros(self.ngames, dtype=bool)
+        for a in (BLINKY, PINKY, INKY):
+            delta = self.pos[:, a] - self.pos[:, PACMAN]
+            dead |= np.sqrt(delta[:, 0]**2 + delta[:, 1]**2) <= 0.5
+        dead &= active
+
+        self.eating[dead] = False
+        self.death_frame[dead] = self.nframes
+        self.playing[dead] = False
+
+def main():
+    print('You are runnning batch.py as a python script')
+
+    batch = BatchSimulation(1000)
+    batch.init()
+    batch.step(n=600)
+    print(f'frame {batch.nframes}: mean score {batch.score.mean()}, playing {batch.playing.sum()}')
+
+if __name__ == '__main__':
+    main()
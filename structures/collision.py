@@ -0,0 +1,87 @@
+#!/usr/bin/env python
+import math
+
+from structures.position import *
+
+def get_sq_threshold(radius: float) -> float:
+    """
+    Largest squared distance d for which math.sqrt(d) <= radius, so comparing squared distances against it
+    agrees exactly with comparing Coord.dist_from against radius.
+    """
+
+    sq = radius*radius
+    while math.sqrt(sq) > radius:
+        sq = math.nextafter(sq, 0)
+    while math.sqrt(math.nextafter(sq, math.inf)) <= radius:
+        sq = math.nextafter(sq, math.inf)
+
+    return sq
+
+# (row, column) offsets of the neighbouring cells checked from each cell; the other half of the
+# neighbourhood is covered when those cells check back, so every pair is only tested once
+HALF_STENCIL = ((0, 1), (1, -1), (1, 0), (1, 1))
+
+class CollisionGrid:
+    """
+    Broad-phase collision detection. Agents are bucketed into a uniform grid of tile-sized cells (larger if
+    the radius calls for it) by position, and only agents in the same or neighbouring cells are compared,
+    by squared distance, so the cost grows with the number of agents rather than the number of pairs.
+
+    Constructor accepts the distance at or under which two agents collide.
+    """
+
+    def __init__(self, radius: float = 0.5) -> None:
+
+        self.radius = radius
+        self.radius_sq = get_sq_threshold(radius)
+        self.cell = max(1.0, radius)
+
+    def get_pairs(self, agents: list) -> list[tuple[int, int]]:
+        """
+        Arguments:
+            agents (list) -- anything with a FloatCoord pos (Agents, or the coords themselves)
+
+        Returns:
+            Every colliding (i, j) pair of indices into agents, with i < j, in sorted order.
+        """
+
+        positions = [a if isinstance(a, Coord) else a.pos for a in agents]
+
+        cells = {}
+        for i, pos in enumerate(positions):
+            cells.setdefault((math.floor(pos.y / self.cell), math.floor(pos.x / self.cell)), []).append(i)
+
+        pairs = []
+        for (r, c), members in cells.items():
+            for k, i in enumerate(members):
+                for j in members[k+1:]:
+                    self._check(positions, i, j, pairs)
+            for dr, dc in HALF_STENCIL:
+                for j in cells.get((r+dr, c+dc), ()):
+                    for i in members:
+                        self._check(positions, i, j, pairs)
+
+        pairs.sort()
+
+        return pairs
+
+    def _check(self, positions: list[FloatCoord], i: int, j: int, pairs: list[tuple[int, int]]) -> None:
+
+        dx, dy = positions[i].x - positions[j].x, positions[i].y - positions[j].y
+        if dx*dx + dy*dy <= self.radius_sq:
+            pairs.append((i, j) if i < j else (j, i))
+
+def main():
+    print('You are runnning collision.py as a python script')
+
+    import random, time
+
+    agents = [FloatCoord(random.uniform(0, 28), random.uniform(0, 31)) for _ in range(1000)]
+    grid = CollisionGrid()
+
+    start = time.perf_counter()
+    pairs = grid.get_pairs(agents)
+    print(f'{len(pairs)} colliding pairs among {len(agents)} agents in {(time.perf_counter()-start)*1000:.2f} ms')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,215 @@
+#!/usr/bin/env python
+from array import array
+
+import numpy as np
+
+from structures.maze import *
+from structures.position import *
+from structures.sim import Simulation
+from structures.batch import BatchSimulation, NO_DIR
+
+# actions are indices into ACTIONS (the directions the player can be sent in), or NO_ACTION to leave the
+# current request in place; the same encoding BatchSimulation takes for its inputs
+ACTIONS = OPEN_DIRS
+NO_ACTION = NO_DIR
+NAGENTS = 4 # pacman, blinky, pinky, inky
+
+def get_cells(list_pos: np.ndarray, nrows: int, ncols: int) -> tuple[np.ndarray, np.ndarray]:
+    """Grid (rows, columns) of (..., 2) list positions, wrapped/clamped onto the grid (agents in the tunnel)."""
+
+    return np.clip(list_pos[..., 1], 0, nrows-1), list_pos[..., 0] % ncols
+
+class PacmanEnv:
+    """
+    Gym-style wrapper around a headless Simulation: reset() and step(action) -> (obs, reward, done, info),
+    with reward the change in score. Observations are a dict of NumPy arrays that are views, updated in
+    place on every step (copy them to keep one):
+        'tiles'  -- (nrows, ncols) uint8 tile codes (see TILE_CODES), a zero-copy view of the maze's grid
+        'agents' -- (4, nrows, ncols) uint8 planes marking the tile of pacman, blinky, pinky and inky
+        'pos'    -- (4, 2) float64 (x, y) positions of the same agents
+
+    Constructor accepts the frame rate, the number of frames each action is held for and an optional
+    frame limit after which an episode ends.
+    """
+
+    def __init__(self, frame_rate: int = 60, frame_skip: int = 1, max_frames: int = None) -> None:
+
+        self.frame_skip = frame_skip
+        self.max_frames = max_frames
+
+        # one Simulation for the lifetime of the env; episodes restore its starting snapshot, so the
+        # maze (and the grid the 'tiles' view reads) is never rebuilt
+        self.sim = Simulation(frame_rate=frame_rate)
+        self.sim.init()
+        self.start = self.sim.snapshot()
+        self.agents = (self.sim.pacman, self.sim.blinky, self.sim.pinky, self.sim.inky)
+
+        # the arrays are views of plain buffers written with scalar stores, so building an observation is
+        # a few dozen attribute reads rather than any array conversion
+        maze = self.sim.maze
+        self.planes = bytearray(NAGENTS*maze.nrows*maze.ncols)
+        self.positions = array('d', [0]) * (2*NAGENTS)
+        self.obs = {'tiles': np.frombuffer(maze.grid, dtype=np.uint8).reshape(maze.nrows, maze.ncols),
+                    'agents': np.frombuffer(self.planes, dtype=np.uint8).reshape(NAGENTS, maze.nrows, maze.ncols),
+                    'pos': np.frombuffer(self.positions, dtype=np.float64).reshape(NAGENTS, 2)}
+        for view in self.obs.values():
+            view.flags.writeable = False
+        # flat index into planes of the tile marked for each agent
+        self.cells = [i*maze.nrows*maze.ncols for i in range(NAGENTS)]
+
+        self.last_score = 0
+        self.rng = None
+
+    def _update_obs(self) -> None:
+
+        nrows, ncols = self.sim.maze.nrows, self.sim.maze.ncols
+        positions, planes, cells = self.positions, self.planes, self.cells
+
+        for i, a in enumerate(self.agents):
+            positions[2*i], positions[2*i+1] = a.pos.x, a.pos.y
+            # same wrapping/clamping as get_cells; only tiles agents left or entered are touched
+            cell = (i*nrows + min(max(a.list_pos.y, 0), nrows-1))*ncols + a.list_pos.x % ncols
+            if cell != cells[i]:
+                planes[cells[i]] = 0
+                cells[i] = cell
+            planes[cell] = 1
+
+    def reset(self, seed: int = None) -> dict:
+        """
+        Arguments: seed (int) -- (optional; default=None) seeds self.rng; the game itself is deterministic,
+                                 so this only matters to callers drawing from self.rng
+        Returns:   the first observation
+        """
+
+        self.rng = np.random.default_rng(seed)
+        self.sim.restore(self.start)
+        self.last_score = 0
+        self._update_obs()
+
+        return self.obs
+
+    def step(self, action: int) -> tuple[dict, int, bool, dict]:
+        """
+        Arguments: action (int) -- index into ACTIONS to send the player in (Player.next_speed), or
+                                   NO_ACTION/None to keep the current request
+        Returns:   (obs, reward, done, info) -- reward is the score gained, done once the player is caught,
+                                                the maze is cleared or max_frames is reached
+        """
+
+        if self.rng is None:
+            raise RuntimeError('PacmanEnv not yet reset, method step unavailable.')
+
+        sim = self.sim
+        sim.step(None if action is None or action == NO_ACTION else ACTIONS[action], n=self.frame_skip)
+        self._update_obs()
+
+        score = sim.pacman.score
+        reward, self.last_score = score - self.last_score, score
+        cleared = sim.maze.is_cleared()
+        done = not sim.playing or cleared or (not self.max_frames is None and sim.nframes >= self.max_frames)
+        info = {'score': score, 'frame': sim.nframes, 'death_frame': sim.death_frame, 'cleared': cleared}
+
+        return self.obs, reward, done, info
+
+class VecPacmanEnv:
+    """
+    Many PacmanEnvs stepped together on a BatchSimulation. Same observations with a leading (nenvs,) axis;
+    'tiles' and 'pos' are zero-copy views of the batch's own arrays. Rewards, dones and the info entries
+    are (nenvs,) arrays. Finished games stay frozen (their rewards read 0) until the next reset(), since
+    every game in a batch shares one frame counter and mode schedule.
+
+    Constructor accepts the number of games and the same options as PacmanEnv.
+    """
+
+    def __init__(self, nenvs: int, frame_rate: int = 60, frame_skip: int = 1, max_frames: int = None) -> None:
+
+        self.nenvs = nenvs
+        self.frame_skip = frame_skip
+        self.max_frames = max_frames
+
+        self.batch = BatchSimulation(nenvs, frame_rate=frame_rate)
+        self.ndots = 0
+        self.obs = None
+        self.cells = None
+        self.last_score = None
+        self.rng = None
+
+    def _update_obs(self) -> None:
+
+        agents = self.obs['agents']
+        games = np.arange(self.nenvs)[:, None]
+        nagents = np.arange(NAGENTS)[None]
+        agents[games, nagents, self.cells[0], self.cells[1]] = 0
+        self.cells = get_cells(self.batch.list_pos, self.batch.nrows, self.batch.ncols)
+        agents[games, nagents, self.cells[0], self.cells[1]] = 1
+
+    def reset(self, seed: int = None) -> dict:
+        """Restart every game. The observation arrays are rebuilt, so views from before a reset go stale."""
+
+        batch = self.batch
+        batch.init()
+        self.rng = np.random.default_rng(seed)
+        self.ndots = int((batch.tiles[0] == TILE_CODES[Tile.DOT]).sum())
+        self.last_score = np.zeros(self.nenvs, dtype=np.int64)
+
+        self.obs = {'tiles': batch.tiles.view(), 'pos': batch.pos.view(),
+                    'agents': np.zeros((self.nenvs, NAGENTS, batch.nrows, batch.ncols), dtype=np.uint8)}
+        self.obs['tiles'].flags.writeable = False
+        self.obs['pos'].flags.writeable = False
+        self.cells = get_cells(batch.list_pos, batch.nrows, batch.ncols)
+        self._update_obs()
+
+        return self.obs
+
+    def step(self, actions: np.ndarray) -> tuple[dict, np.ndarray, np.ndarray, dict]:
+        """
+        Arguments: actions (np.ndarray) -- (nenvs,) indices into ACTIONS, NO_ACTION to keep the current request
+        Returns:   (obs, rewards, dones, info), see PacmanEnv.step
+        """
+
+        if self.rng is None:
+            raise RuntimeError('VecPacmanEnv not yet reset, method step unavailable.')
+
+        batch = self.batch
+        batch.step(actions, n=self.frame_skip)
+
+        # every point comes from a dot, so a game is cleared once it has scored all of them
+        cleared = batch.score == 10*self.ndots
+        batch.playing[cleared] = False
+        self._update_obs()
+
+        rewards = batch.score - self.last_score
+        self.last_score = batch.score.copy()
+        dones = ~batch.playing
+        if not self.max_frames is None and batch.nframes >= self.max_frames:
+            dones[:] = True
+        info = {'score': batch.score, 'frame': batch.nframes, 'death_frame': batch.death_frame, 'cleared': cleared}
+
+        return self.obs, rewards, dones, info
+
+def main():
+    print('You are runnning env.py as a python script')
+
+    import time
+
+    env = PacmanEnv()
+    obs, done, total, nsteps = env.reset(seed=0), False, 0, 0
+    start = time.perf_counter()
+    while not done:
+        obs, reward, done, info = env.step(env.rng.integers(len(ACTIONS)+1))
+        total += reward
+        nsteps += 1
+    elapsed = time.perf_counter() - start
+    print(f'PacmanEnv: {nsteps} steps, return {total}, {elapsed/nsteps*1e6:.1f} us per step')
+
+    vec = VecPacmanEnv(256)
+    vec.reset(seed=0)
+    start = time.perf_counter()
+    for _ in range(600):
+        obs, rewards, dones, info = vec.step(vec.rng.integers(len(ACTIONS)+1, size=vec.nenvs))
+    elapsed = time.perf_counter() - start
+    print(f'VecPacmanEnv: {vec.nenvs} envs x 600 steps, mean score {info["score"].mean():.1f}, '
+          f'{elapsed/600/vec.nenvs*1e6:.2f} us per env step')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,194 @@
+#!/usr/bin/env python
+import os
+import mmap
+import argparse
+import struct
+import hashlib
+from array import array
+
+from structures.maze import *
+
+# compiled layouts are cached here, one file per layout content hash
+CACHE_DIR = os.environ.get('PACMAN_CACHE_DIR', os.path.join(os.path.expanduser('~'), '.cache', 'pacman'))
+
+# magic, nrows, ncols, ndots, ntunnels, house (r0, c0, r1, c1); followed by ntunnels (row, left, right)
+# triples, the row-major tile codes and the flat indices of every dot (32-bit, so grids can go past
+# 65,535 tiles)
+HEADER = struct.Struct('<4sHHIH4i')
+TUNNEL = struct.Struct('<HHH')
+MAGIC = b'PMZ2'
+DOT_TYPE = 'I' if array('I').itemsize == 4 else 'L'
+
+class Layout:
+    """
+    A compiled maze layout: the row-major tile codes (see TILE_CODES) plus metadata worked out once at
+    compile time.
+
+        tunnels -- (row, left, right) for every row that wraps around, where left/right are how many
+                   columns the tunnel runs in from each edge before it opens up
+        house   -- (r0, c0, r1, c1) inclusive bounds of the ghost door and the ghost-only area behind it,
+                   or None if the layout has no ghost house
+        dots    -- flat indices (r*ncols + c) of every dot
+    """
+
+    def __init__(self, nrows: int, ncols: int, grid: bytes, dots: array,
+                 tunnels: tuple = (), house: tuple = None) -> None:
+
+        self.nrows = nrows
+        self.ncols = ncols
+        self.grid = grid
+        self.dots = dots
+        self.tunnels = tunnels
+        self.house = house
+
+    def get_ndots(self) -> int:
+        return len(self.dots)
+
+    def to_bytes(self) -> bytes:
+
+        house = self.house if not self.house is None else (-1, -1, -1, -1)
+        header = HEADER.pack(MAGIC, self.nrows, self.ncols, len(self.dots), len(self.tunnels), *house)
+
+        return b''.join([header, *[TUNNEL.pack(*t) for t in self.tunnels], bytes(self.grid),
+                         array(DOT_TYPE, self.dots).tobytes()])
+
+    @classmethod
+    def from_buffer(cls, buf) -> 'Layout':
+        """Unpack a compiled layout. The grid and dots are copied out, so buf can be closed afterwards."""
+
+        magic, nrows, ncols, ndots, ntunnels, *house = HEADER.unpack_from(buf)
+        if magic != MAGIC:
+            raise ValueError('Not a compiled maze layout.')
+
+        offset = HEADER.size
+        tunnels = tuple(TUNNEL.unpack_from(buf, offset + i*TUNNEL.size) for i in range(ntunnels))
+        offset += ntunnels*TUNNEL.size
+        grid = bytes(buf[offset:offset + nrows*ncols])
+        offset += nrows*ncols
+        dots = array(DOT_TYPE, bytes(buf[offset:offset + 4*ndots]))
+
+        return cls(nrows, ncols, grid, dots, tunnels, None if house[0] < 0 else tuple(house))
+
+def compile_layout(text: str) -> Layout:
+    """
+    Arguments:
+        text (str) -- one line per maze row using the Tile values ('-', 'o', 'E', 'X', 'G'); blank lines
+                      and lines starting with '#' are skipped
+
+    Returns:
+        The compiled Layout. Raises ValueError on ragged rows or unknown characters.
+    """
+
+    rows = [line.rstrip('\r\n') for line in text.splitlines()]
+    rows = [row for row in rows if row.strip() and not row.startswith('#')]
+    if not rows:
+        raise ValueError('Maze layout has no rows.')
+
+    nrows, ncols = len(rows), len(rows[0])
+    codes = {t.value: TILE_CODES[t] for t in Tile}
+    grid = bytearray(nrows*ncols)
+    for r, row in enumerate(rows):
+        if len(row) != ncols:
+            raise ValueError(f'Maze layout row {r} has {len(row)} columns, expected {ncols}.')
+        for c, char in enumerate(row):
+            if not char in codes:
+                raise ValueError(f'Unknown maze tile {char!r} at row {r}, column {c}.')
+            grid[r*ncols + c] = codes[char]
+
+    dots = array(DOT_TYPE, [i for i, code in enumerate(grid) if code == TILE_CODES[Tile.DOT]])
+
+    open_codes = {TILE_CODES[Tile.EMPTY], TILE_CODES[Tile.DOT]}
+    def is_open(r, c):
+        return 0 <= r < nrows and grid[r*ncols + c] in open_codes
+
+    # a tunnel runs in from each edge for as long as it is walled off above and below
+    tunnels = []
+    for r in range(nrows):
+        if is_open(r, 0) and is_open(r, ncols-1):
+            sides = [is_open(r-1, c) or is_open(r+1, c) for c in range(ncols)]
+            left = next((c for c in range(ncols) if sides[c]), ncols)
+            right = next((ncols-1-c for c in reversed(range(ncols)) if sides[c]), ncols)
+            tunnels.append((r, left, right))
+
+    # the ghost house is the ghost door plus the out-of-bounds area reachable through it
+    house = None
+    door = [i for i, code in enumerate(grid) if code == TILE_CODES[Tile.GHOST_WALL]]
+    if door:
+        inside, queue = set(door), list(door)
+        while queue:
+            r, c = divmod(queue.pop(), ncols)
+            for dx, dy in OPEN_VECS:
+                ar, ac = r+dy, c+dx
+                if 0 <= ar < nrows and 0 <= ac < ncols and not ar*ncols+ac in inside \
+                    and grid[ar*ncols+ac] in (TILE_CODES[Tile.OOB], TILE_CODES[Tile.GHOST_WALL]):
+                    inside.add(ar*ncols+ac)
+                    queue.append(ar*ncols+ac)
+        rs, cs = [i // ncols for i in inside], [i % ncols for i in inside]
+        house = (min(rs), min(cs), max(rs), max(cs))
+
+    return Layout(nrows, ncols, bytes(grid), dots, tuple(tunnels), house)
+
+def load_layout(path: os.PathLike, cache_dir: os.PathLike = None) -> Layout:
+    """
+    Arguments:
+        path (PathLike)      -- text layout (see compile_layout)
+        cache_dir (PathLike) -- (optional; default=CACHE_DIR/mazes) where compiled layouts are kept
+
+    Returns:
+        The compiled Layout, read through mmap from a binary file keyed by the text's content hash. The
+        text is only compiled (and the binary written) on a cache miss. An unwritable cache directory
+        just means compiling every time.
+    """
+
+    with open(path, 'rb') as f:
+        text = f.read()
+
+    cache_dir = os.path.join(CACHE_DIR, 'mazes') if cache_dir is None else cache_dir
+    cache_path = os.path.join(cache_dir, hashlib.sha256(text).hexdigest()[:32] + '.pmz')
+
+    try:
+        with open(cache_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+            return Layout.from_buffer(buf)
+    except (OSError, ValueError, struct.error):
+        pass
+
+    layout = compile_layout(text.decode())
+
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp_path = f'{cache_path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(layout.to_bytes())
+        os.replace(tmp_path, cache_path) # atomic, so concurrent loaders never see half a file
+    except OSError:
+        pass
+
+    return layout
+
+def main():
+    print('You are runnning layout.py as a python script')
+
+    parser = argparse.ArgumentParser(description='Compile maze layouts into the cache and describe them.')
+    parser.add_argument('layouts', nargs='*', help='text layouts to compile')
+    parser.add_argument('--write-classic', metavar='OUT', default=None,
+                        help=f'write the hand-built classic board (Maze.paint_classic) as a text layout to OUT, '
+                             f'e.g. {os.path.relpath(CLASSIC_LAYOUT)} to regenerate it')
+    args = parser.parse_args()
+
+    if args.write_classic is None and not args.layouts:
+        parser.error('nothing to do, give layouts to compile or --write-classic OUT')
+
+    if not args.write_classic is None:
+        maze = Maze()
+        maze.paint_classic()
+        with open(args.write_classic, 'w') as f:
+            f.write(repr(maze) + '\n')
+        print(f'wrote {args.write_classic}')
+
+    for path in args.layouts:
+        layout = load_layout(path)
+        print(f'{path}: {layout.nrows}x{layout.ncols}, {layout.get_ndots()} dots, '
+              f'tunnels {layout.tunnels}, house {layout.house}')
+
+if __name__ == '__main__':
+    main()
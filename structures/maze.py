@@ -2,11 +2,9 @@
 
 from enum import Enum
 from typing import Sequence
-#import os, sys
-from pygame import Rect
-
-#SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
-#sys.path.append(os.path.dirname(SCRIPT_DIR))
+from collections import OrderedDict, deque
+from array import array
+import os
 
 from structures.position import *
 
@@ -21,33 +19,402 @@ class Tile(Enum):
     def __str__(self) -> str:
         return self.__repr__()
 
+# integer codes used by the compact grid storage (one byte per tile)
+TILE_CODES = {t: i for i, t in enumerate(Tile)}
+CODE_TILES = tuple(Tile)
+
+# passable-tile sets for the player, a ghost outside the house and a ghost inside the house
+PLAYER_TILES = (Tile.EMPTY, Tile.DOT)
+GHOST_TILES = (Tile.EMPTY, Tile.DOT)
+HOME_TILES = (Tile.EMPTY, Tile.DOT, Tile.GHOST_WALL, Tile.OOB)
+
+def get_tile_bits(tiles: Sequence[Tile]) -> int:
+    """Pack a passable-tile set into an int with bit TILE_CODES[t] set for every tile t."""
+
+    bits = 0
+    for t in tiles:
+        bits |= 1 << TILE_CODES[t]
+    
+    return bits
+
+# bit i of an open-direction mask is set when the tile towards OPEN_DIRS[i] is passable; tiles
+# with more than two exits also get the JUNCTION bit
+OPEN_DIRS = list(Direction)[::2]
+OPEN_VECS = [ListCoord(dir=d).get_tuple() for d in OPEN_DIRS]
+OPEN_BITS = {d: 1 << i for i, d in enumerate(OPEN_DIRS)}
+JUNCTION = 1 << len(OPEN_DIRS)
+OPEN_TURNS = [tuple(d for d in OPEN_DIRS if mask & OPEN_BITS[d]) for mask in range(2*JUNCTION)]
+
+# agents' list positions can sit up to two tiles outside the grid in the tunnel
+OPEN_PAD = 2
+
+# text layout of the classic board (see structures/layout.py)
+CLASSIC_LAYOUT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'mazes', 'classic.txt')
+
+# distance metrics for distance tables and ghost turn decisions
+EUCLID_SQ, PATH = 'euclid_sq', 'path'
+NO_PATH = 0xFFFF
+
+# flow field entry for tiles with no move towards the target (walls, unreachable tiles, the target itself)
+NO_FLOW = 0xFF
+
+# maps dots to empty tiles, so two grids that only differ in dots translate to the same bytes
+DOTLESS = bytes.maketrans(bytes([TILE_CODES[Tile.DOT]]), bytes([TILE_CODES[Tile.EMPTY]]))
+
 class Maze:
 
     # static constants
     BOUNDARY_TILES = (Tile.EDGE, Tile.OOB, Tile.GHOST_WALL)
 
     def __init__(self, nrows: int = 31, ncols: int = 28) -> None:
-        self.tiles = [[Tile.EMPTY for _ in range(ncols)] for _ in range(nrows)]
+        # row-major grid of tile codes, one byte per tile
+        self.grid = bytearray([TILE_CODES[Tile.EMPTY]]) * (nrows*ncols)
         self.nrows = nrows
         self.ncols = ncols
+
+        # live set of (r, c) tiles still holding a dot, kept in sync by set_tile
+        self.dots = set()
+
+        # layout metadata (see structures/layout.Layout), filled in by load, plus what is derived from it:
+        # the first and last column of the open middle of each tunnel row, and the house exit tile
+        self.tunnels, self.house = (), None
+        self.tunnel_rows = {}
+        self.exit = None
+
+        # open-direction masks per passable-tile set (keyed by get_tile_bits), built on first use
+        self.open_dirs = {}
+
+        # all-pairs distance tables keyed by (bits, metric), and an LRU of ghost turn decisions
+        self.dist_tables = {}
+        self.turn_cache = OrderedDict()
+        self.turn_cache_size = 4096
+        self.turn_bits = set() # passable sets with decisions in turn_cache (may include evicted ones)
+
+        # LRU of BFS flow fields keyed by (bits, target row, target column)
+        self.flow_fields = OrderedDict()
+        self.flow_field_size = 64
+
+        # immutable copy of the board handed out by get_state, dropped whenever a tile changes
+        self.state = None
     
     def __repr__(self) -> str:
         return '\n'.join([''.join([str(t) for t in row]) for row in self.tiles])
     
+    @property
+    def tiles(self) -> list[list[Tile]]:
+        """A list-of-lists copy of the grid as Tile members. Use get_view() for bulk reads."""
+
+        return [[CODE_TILES[code] for code in self.grid[r*self.ncols:(r+1)*self.ncols]]
+                for r in range(self.nrows)]
+    
+    def get_view(self) -> memoryview:
+        """Zero-copy, read-only (nrows, ncols) view of the tile codes (see TILE_CODES)."""
+
+        return memoryview(self.grid).toreadonly().cast('B', (self.nrows, self.ncols))
+    
+    def get_ndots(self) -> int:
+        return len(self.dots)
+    
+    def is_cleared(self) -> bool:
+        """Whether every dot has been eaten."""
+        return not self.dots
+    
+    def in_tunnel_rc(self, r: int, c: int) -> bool:
+        """Whether r, c lies in one of the layout's tunnels, where columns wrap around the board."""
+
+        bounds = self.tunnel_rows.get(r)
+
+        return not bounds is None and (c < bounds[0] or c >= bounds[1])
+    
+    def get_code_rc(self, r: int, c: int) -> int:
+        """Same lookup as get_tile_rc but returns the raw tile code."""
+
+        if self.in_tunnel_rc(r, c):
+            c = (c + self.ncols) % self.ncols
+        
+        if r < 0 or c < 0 or r >= self.nrows or c >= self.ncols:
+            return TILE_CODES[Tile.OOB]
+        
+        return self.grid[r*self.ncols + c]
+    
+    def get_tile_rc(self, r: int, c: int) -> Tile:
+        """
+        Arguments: r, c (int) -- row and column of the tile
+        Returns:       (Tile) -- the tile there, wrapping through the tunnel like get_tile but
+                                 without building (or mutating) a ListCoord
+        """
+
+        return CODE_TILES[self.get_code_rc(r, c)]
+    
     def get_tile(self, pos: ListCoord) -> Tile:
-        if pos.getr() == 14 and (pos.getc() < 6 or pos.getc() >= self.ncols-6):
+        if self.in_tunnel_rc(pos.getr(), pos.getc()):
             pos.wrap(self.ncols, self.nrows)
         
-        if not pos.is_in_bounds(self.nrows, self.ncols):
-            return Tile.OOB
+        return self.get_tile_rc(pos.y, pos.x)
+    
+    def set_tile_rc(self, r: int, c: int, ttype: Tile) -> None:
+
+        old, new = self.grid[r*self.ncols + c], TILE_CODES[ttype]
+        if old == new:
+            return
         
-        return self.tiles[pos.getr()][pos.getc()]
+        self.grid[r*self.ncols + c] = new
+        self.state = None
+
+        if old == TILE_CODES[Tile.DOT]:
+            self.dots.discard((r, c))
+        elif new == TILE_CODES[Tile.DOT]:
+            self.dots.add((r, c))
+
+        # drop any table whose passability just changed (eating a dot keeps them all)
+        def changed(bits):
+            return (bits >> old) & 1 != (bits >> new) & 1
+
+        for bits in [b for b in self.open_dirs if changed(b)]:
+            del self.open_dirs[bits]
+        for key in [k for k in self.dist_tables if changed(k[0])]:
+            del self.dist_tables[key]
+        if any(changed(bits) for bits in self.turn_bits):
+            self.turn_cache.clear()
+            self.turn_bits.clear()
+        for key in [k for k in self.flow_fields if changed(k[0])]:
+            del self.flow_fields[key]
     
     def set_tile(self, pos: ListCoord, ttype: Tile) -> None:
-        self.tiles[pos.y][pos.x] = ttype
+        self.set_tile_rc(pos.y, pos.x, ttype)
+    
+    def _get_open_uncached(self, r: int, c: int, bits: int) -> int:
+
+        mask, nexits = 0, 0
+        for i, (dx, dy) in enumerate(OPEN_VECS):
+            if (bits >> self.get_code_rc(r+dy, c+dx)) & 1:
+                mask |= 1 << i
+                nexits += 1
+        
+        return mask | JUNCTION if nexits > 2 else mask
+    
+    def get_open_dirs(self, bits: int) -> bytearray:
+        """
+        Arguments: bits (int) -- passable-tile set as returned by get_tile_bits
+        Returns:   (bytearray) -- row-major open-direction masks covering rows/columns -OPEN_PAD to
+                                  nrows/ncols+OPEN_PAD-1. Built once and reused until set_tile
+                                  changes passability for this set.
+        """
+
+        masks = self.open_dirs.get(bits)
+
+        if masks is None:
+            masks = bytearray(self._get_open_uncached(r, c, bits)
+                              for r in range(-OPEN_PAD, self.nrows+OPEN_PAD)
+                              for c in range(-OPEN_PAD, self.ncols+OPEN_PAD))
+            self.open_dirs[bits] = masks
+        
+        return masks
+    
+    def get_open_rc(self, r: int, c: int, bits: int) -> int:
+        """Open-direction mask (see OPEN_BITS/JUNCTION) of the tile at r, c for a passable-tile set."""
+
+        if -OPEN_PAD <= r < self.nrows+OPEN_PAD and -OPEN_PAD <= c < self.ncols+OPEN_PAD:
+            return self.get_open_dirs(bits)[(r+OPEN_PAD)*(self.ncols+2*OPEN_PAD) + c+OPEN_PAD]
+        
+        return self._get_open_uncached(r, c, bits)
+    
+    def _wrap_rc(self, r: int, c: int) -> tuple[int, int]:
+        if self.in_tunnel_rc(r, c):
+            c = (c + self.ncols) % self.ncols
+        
+        return r, c
+    
+    def get_dist_table(self, bits: int, metric: str = EUCLID_SQ) -> tuple[array, int, array]:
+        """
+        Arguments:
+            bits (int)   -- passable-tile set as returned by get_tile_bits
+            metric (str) -- (optional; default=EUCLID_SQ) EUCLID_SQ for squared straight-line distance
+                            or PATH for the number of moves along passable tiles (NO_PATH if unreachable)
+        
+        Returns:
+            (ids, n, table) -- ids maps a flat grid index (r*ncols+c) to one of the n passable-tile ids
+                               (-1 for walls), and table[i*n+j] holds the distance between passable
+                               tiles i and j. Built once per set/metric and kept until set_tile
+                               changes passability.
+        """
+
+        key = (bits, metric)
+        if key in self.dist_tables:
+            return self.dist_tables[key]
+
+        ids = array('i', [-1]) * (self.nrows*self.ncols)
+        nodes = []
+        for i, code in enumerate(self.grid):
+            if (bits >> code) & 1:
+                ids[i] = len(nodes)
+                nodes.append(divmod(i, self.ncols))
+        n = len(nodes)
+
+        if metric == EUCLID_SQ:
+            table = array('I', [(r0-r1)**2 + (c0-c1)**2 for r0, c0 in nodes for r1, c1 in nodes])
+        elif metric == PATH:
+            table = array('H', [NO_PATH]) * (n*n)
+            for start, (r0, c0) in enumerate(nodes):
+                row = start*n
+                table[row+start] = 0
+                queue = deque([(r0, c0)])
+                while queue:
+                    r, c = queue.popleft()
+                    dist = table[row+ids[r*self.ncols+c]] + 1
+                    mask = self.get_open_rc(r, c, bits)
+                    for i, (dx, dy) in enumerate(OPEN_VECS):
+                        if mask & (1 << i):
+                            ar, ac = self._wrap_rc(r+dy, c+dx)
+                            # passable off-grid tiles (OOB in the HOME set) have no table entry
+                            if not (0 <= ar < self.nrows and 0 <= ac < self.ncols):
+                                continue
+                            adj = row + ids[ar*self.ncols+ac]
+                            if table[adj] == NO_PATH:
+                                table[adj] = dist
+                                queue.append((ar, ac))
+        else:
+            raise ValueError(f'Unknown distance metric {metric!r}.')
+
+        self.dist_tables[key] = (ids, n, table)
+
+        return self.dist_tables[key]
+    
+    def get_dist_rc(self, r0: int, c0: int, r1: int, c1: int, bits: int, metric: str = EUCLID_SQ) -> int:
+        """Table distance between two tiles (wrapped through the tunnel), or -1 if either is not passable."""
+
+        r0, c0 = self._wrap_rc(r0, c0)
+        r1, c1 = self._wrap_rc(r1, c1)
+        if not (0 <= r0 < self.nrows and 0 <= c0 < self.ncols and 0 <= r1 < self.nrows and 0 <= c1 < self.ncols):
+            return -1
+
+        ids, n, table = self.get_dist_table(bits, metric)
+        i, j = ids[r0*self.ncols+c0], ids[r1*self.ncols+c1]
+        if i < 0 or j < 0:
+            return -1
+
+        return table[i*n+j]
     
-    def get_tile_rects(self, pos: ListCoord, tsize: int) -> list[Rect]:
+    def _get_turn_uncached(self, r: int, c: int, heading: Direction, tr: int, tc: int,
+                           bits: int, metric: str) -> Direction:
+
+        reverse = REVERSE_DIRS.get(heading)
+        best_turn = heading
+        mindist = (self.nrows+self.ncols+1)**2 if metric == EUCLID_SQ else NO_PATH
+
+        for turn in OPEN_TURNS[self.get_open_rc(r, c, bits)]:
+            if turn != reverse:
+                dx, dy = DIR_VECS[turn]
+
+                if metric == EUCLID_SQ:
+                    curdist = (c+dx-tc)**2 + (r+dy-tr)**2
+                else:
+                    curdist = self.get_dist_rc(r+dy, c+dx, tr, tc, bits, metric)
+                    if curdist < 0:
+                        continue
+
+                if curdist < mindist:
+                    mindist = curdist
+                    best_turn = turn
+        
+        return best_turn
+    
+    def get_turn(self, pos: ListCoord, heading: Direction, target: ListCoord, bits: int,
+                 metric: str = EUCLID_SQ) -> Direction:
+        """
+        Arguments:
+            pos (ListCoord)     -- tile the ghost is deciding on
+            heading (Direction) -- the ghost's current direction (never reversed)
+            target (ListCoord)  -- tile the ghost is heading for
+            bits (int)          -- the ghost's passable-tile set (see get_tile_bits)
+            metric (str)        -- (optional; default=EUCLID_SQ) EUCLID_SQ picks the same turns as
+                                   comparing Coord.dist_from; PATH uses the BFS distance table and
+                                   ignores turns (or targets) that aren't on a passable tile
+        
+        Returns:
+            The open direction whose adjacent tile is nearest the target, or heading if none is.
+            Decisions are memoized in an LRU of at most turn_cache_size entries.
+        """
+
+        key = (bits, metric, pos.x, pos.y, heading, target.x, target.y)
+        turn = self.turn_cache.get(key)
+
+        if turn is None:
+            turn = self._get_turn_uncached(pos.y, pos.x, heading, target.y, target.x, bits, metric)
+            self.turn_cache[key] = turn
+            self.turn_bits.add(bits)
+            if len(self.turn_cache) > self.turn_cache_size:
+                self.turn_cache.popitem(last=False)
+        else:
+            self.turn_cache.move_to_end(key)
         
+        return turn
+    
+    def _get_flow_field_uncached(self, tr: int, tc: int, bits: int) -> bytearray:
+
+        field = bytearray([NO_FLOW]) * (self.nrows*self.ncols)
+        if not (0 <= tr < self.nrows and 0 <= tc < self.ncols) or not (bits >> self.grid[tr*self.ncols+tc]) & 1:
+            return field
+
+        # BFS out from the target; each tile reached points back along the edge it was reached by
+        seen = bytearray(self.nrows*self.ncols)
+        seen[tr*self.ncols+tc] = 1
+        queue = deque([(tr, tc)])
+        while queue:
+            r, c = queue.popleft()
+            mask = self.get_open_rc(r, c, bits)
+            for i, (dx, dy) in enumerate(OPEN_VECS):
+                if mask & (1 << i):
+                    ar, ac = self._wrap_rc(r+dy, c+dx)
+                    if 0 <= ar < self.nrows and 0 <= ac < self.ncols and not seen[ar*self.ncols+ac]:
+                        seen[ar*self.ncols+ac] = 1
+                        field[ar*self.ncols+ac] = (i + len(OPEN_DIRS)//2) % len(OPEN_DIRS)
+                        queue.append((ar, ac))
+
+        return field
+
+    def get_flow_field(self, target: ListCoord, bits: int) -> bytearray:
+        """
+        Arguments:
+            target (ListCoord) -- tile to head for (wrapped through the tunnel)
+            bits (int)         -- passable-tile set as returned by get_tile_bits
+
+        Returns:
+            (bytearray) -- row-major, one entry per tile: the index into OPEN_DIRS of the first move on a
+                           shortest path to target, or NO_FLOW. Any number of agents chasing the same tile
+                           share one field, which is only rebuilt when the target reaches a new tile or
+                           set_tile changes passability for this set (LRU of flow_field_size fields).
+        """
+
+        tr, tc = self._wrap_rc(target.y, target.x)
+        key = (bits, tr, tc)
+        field = self.flow_fields.get(key)
+
+        if field is None:
+            field = self._get_flow_field_uncached(tr, tc, bits)
+            self.flow_fields[key] = field
+            if len(self.flow_fields) > self.flow_field_size:
+                self.flow_fields.popitem(last=False)
+        else:
+            self.flow_fields.move_to_end(key)
+
+        return field
+
+    def get_flow_dir(self, pos: ListCoord, target: ListCoord, bits: int) -> Direction:
+        """Direction of the first move on a shortest path from pos to target, or None if there is none."""
+
+        r, c = self._wrap_rc(pos.y, pos.x)
+        if not (0 <= r < self.nrows and 0 <= c < self.ncols):
+            return None
+
+        ind = self.get_flow_field(target, bits)[r*self.ncols+c]
+
+        return None if ind == NO_FLOW else OPEN_DIRS[ind]
+
+    def get_tile_rects(self, pos: ListCoord, tsize: int) -> list['Rect']:
+        
+        from pygame import Rect # drawing only, keep pygame out of the simulation's imports
+
         if not pos.is_in_bounds(self.nrows, self.ncols):
             raise IndexError('Cannot get drawable points for out-of-bounds maze tile.')
         
@@ -96,8 +463,98 @@ class Maze:
         for block in blocks:
             self.add_block(block, ttype)
     
-    def init(self):
-        """Set up all walls/edges in maze separately from constructor method."""
+    def load(self, layout) -> None:
+        """Replace the board with a compiled layout (structures/layout.Layout), resizing to fit it."""
+
+        self.nrows, self.ncols = layout.nrows, layout.ncols
+        self.grid = bytearray(layout.grid)
+        self.dots = {divmod(i, self.ncols) for i in layout.dots}
+        self.tunnels, self.house = layout.tunnels, layout.house
+        self.tunnel_rows = {r: (left, self.ncols-right) for r, left, right in self.tunnels}
+        self.exit = self._get_exit()
+        self.state = None
+
+        self._clear_tables()
+
+    def _get_exit(self) -> ListCoord:
+        """The tile above the leftmost door tile of the ghost house, None if the layout has no house."""
+
+        if self.house is None:
+            return None
+
+        r0, c0, _, c1 = self.house
+        door = [c for c in range(c0, c1+1) if self.get_tile_rc(r0, c) == Tile.GHOST_WALL]
+
+        return None if not door else ListCoord(door[0], r0-1)
+
+    def _clear_tables(self) -> None:
+
+        self.open_dirs.clear()
+        self.dist_tables.clear()
+        self.turn_cache.clear()
+        self.turn_bits.clear()
+        self.flow_fields.clear()
+
+    def get_state(self) -> tuple[bytes, frozenset]:
+        """
+        Returns:
+            (grid, dots) -- immutable copy of the tile codes and the dot set. The copy is only taken when
+                            the board changed since the last call, so snapshots in between share it.
+        """
+
+        if self.state is None:
+            self.state = (bytes(self.grid), frozenset(self.dots))
+
+        return self.state
+
+    def set_state(self, state: tuple[bytes, frozenset]) -> None:
+        """Put back a board from get_state (same size). Cached tables are kept unless passability differs."""
+
+        if state is self.state:
+            return
+
+        grid, dots = state
+        if len(grid) != len(self.grid):
+            raise ValueError('Board state does not match the size of this maze.')
+        if grid.translate(DOTLESS) != self.grid.translate(DOTLESS):
+            self._clear_tables()
+
+        self.grid[:] = grid
+        self.dots = set(dots)
+        self.state = state
+
+    def copy(self) -> 'Maze':
+        """Independent copy of the board. Cached tables are shared until either maze changes passability."""
+
+        maze = Maze(self.nrows, self.ncols)
+        maze.grid = bytearray(self.grid)
+        maze.dots = set(self.dots)
+        maze.tunnels, maze.house = self.tunnels, self.house
+        maze.tunnel_rows, maze.exit = self.tunnel_rows, self.exit
+        maze.state = self.state
+
+        maze.open_dirs = dict(self.open_dirs)
+        maze.dist_tables = dict(self.dist_tables)
+        maze.turn_cache = OrderedDict(self.turn_cache)
+        maze.turn_cache_size = self.turn_cache_size
+        maze.turn_bits = set(self.turn_bits)
+        maze.flow_fields = OrderedDict(self.flow_fields)
+        maze.flow_field_size = self.flow_field_size
+
+        return maze
+
+    def init(self, path: os.PathLike = None) -> None:
+        """
+        Set up all walls/edges in maze separately from constructor method, from a text layout file
+        (compiled and cached by structures/layout.py). Leave path as None for the classic board.
+        """
+
+        from structures.layout import load_layout
+
+        self.load(load_layout(CLASSIC_LAYOUT if path is None else path))
+
+    def paint_classic(self) -> None:
+        """Paint the classic board block by block. This is what mazes/classic.txt was generated from."""
 
         self.add_block(((0,0),(-1,-1)), Tile.EDGE) # outer box
         self.add_block(((1,1),(-2,-2)), Tile.EMPTY)
@@ -12,24 +12,17 @@ class Direction(Enum):
     E, NE, N, NW = 0, 1, 2, 3
     W, SW, S, SE = 4, 5, 6, 7
 
-def get_dir_angle(dir: Direction) -> int:
+# unit vectors, angles and reverses for every Direction, computed once instead of per call
+DIR_VECS = {Direction.E: (1, 0), Direction.NE: (1, -1), Direction.N: (0, -1), Direction.NW: (-1, -1),
+            Direction.W: (-1, 0), Direction.SW: (-1, 1), Direction.S: (0, 1), Direction.SE: (1, 1)}
+DIR_ANGLES = {d: 45*i for i, d in enumerate(Direction)}
+REVERSE_DIRS = {d: list(Direction)[(i+len(Direction)//2)%len(Direction)] for i, d in enumerate(Direction)}
 
-    match dir:
-        case Direction.E: return 0
-        case Direction.NE: return 45
-        case Direction.N: return 90
-        case Direction.NW: return 135
-        case Direction.W: return 180
-        case Direction.SW: return 225
-        case Direction.S: return 270
-        case Direction.SE: return 315
+def get_dir_angle(dir: Direction) -> int:
+    return DIR_ANGLES.get(dir)
 
 def get_reverse(dir: Direction) -> Direction:
-    
-    dirs = list(Direction)
-    dir_ind = dirs.index(dir)
-
-    return dirs[(dir_ind+len(dirs)//2)%len(dirs)]
+    return REVERSE_DIRS[dir]
 
 class Coord:
     """
@@ -39,8 +32,13 @@ class Coord:
     Constructor method accepts either x+y values, a vector represented as a 2-length
     sequence, or a Direction indicating where the vector should point. Direction-based
     vectors always have abs(x) and abs(y) = 0 or 1.
+
+    Coords are slotted (no __dict__). Arithmetic operators return new objects; the iadd,
+    isub and imul methods update this object in place instead.
     """
 
+    __slots__ = ('x', 'y')
+
     def __init__(self, x: CoordVal = None, y: CoordVal = None,
                  v: tuple[CoordVal, CoordVal] = None,
                  dir: Direction = None) -> None:
@@ -52,26 +50,20 @@ class Coord:
             self.x = v[0]
             self.y = v[1]
         elif not dir is None: # dir only used when no other args passed to constructor
-            match dir:
-                case Direction.N:
-                    self.x, self.y = 0, -1
-                case Direction.S:
-                    self.x, self.y = 0, 1
-                case Direction.E:
-                    self.x, self.y = 1, 0
-                case Direction.W:
-                    self.x, self.y = -1, 0
-                case Direction.NE:
-                    self.x, self.y = 1, -1
-                case Direction.NW:
-                    self.x, self.y = -1, -1
-                case Direction.SE:
-                    self.x, self.y = 1, 1
-                case Direction.SW:
-                    self.x, self.y = -1, 1
+            self.x, self.y = DIR_VECS[dir]
         else: # raise error if Coord constructor called with invalid arguments
             raise ValueError('Too many NoneTypes passed to Coord constructor.')
     
+    @classmethod
+    def _make(cls, x: CoordVal, y: CoordVal):
+        """Build a coordinate from already-converted x+y values, skipping the constructor checks."""
+
+        coord = object.__new__(cls)
+        coord.x = x
+        coord.y = y
+
+        return coord
+    
     def __repr__(self) -> str:
         return f'(x: {self.x}, y: {self.y})'
     
@@ -84,6 +76,30 @@ class Coord:
     def __sub__(self, coord):
         return type(self)(self.x-coord.x, self.y-coord.y)
     
+    def iadd(self, coord, scale: CoordVal = 1):
+        """Add coord (optionally scaled first) to this object in place and return it."""
+
+        self.x += coord.x*scale
+        self.y += coord.y*scale
+
+        return self
+    
+    def isub(self, coord):
+        """Subtract coord from this object in place and return it."""
+
+        self.x -= coord.x
+        self.y -= coord.y
+
+        return self
+    
+    def imul(self, scale: CoordVal):
+        """Scale this object in place and return it."""
+
+        self.x *= scale
+        self.y *= scale
+
+        return self
+    
     def get_tuple(self) -> tuple:
         """Get vector components as 2-tuple of form (x,y)."""
         return (self.x, self.y)
@@ -128,24 +144,34 @@ class ListCoord(Coord):
     elements from 2-D lists.
     """
 
+    __slots__ = ()
+
     def __init__(self,
                  x: int = None, y: int = None,
                  v: tuple[int, int] = None,
                  dir: Direction = None,
                  coord: Coord = None) -> None:
-        if not x is None and not y is None: super().__init__(int(x), int(y), v, dir)
-        elif not coord is None and isinstance(coord, Coord): super().__init__(x=int(coord.x), y=int(coord.y))
+        if not x is None and not y is None:
+            self.x = int(x)
+            self.y = int(y)
+        elif not coord is None and isinstance(coord, Coord):
+            self.x = int(coord.x)
+            self.y = int(coord.y)
         else: super().__init__(x, y, v, dir)
     
     def __add__(self, coord):
-        return ListCoord(self.x+int(coord.x), self.y+int(coord.y))
+        return ListCoord._make(self.x+int(coord.x), self.y+int(coord.y))
     
     def get_adj(self, dir: Direction):
         """ Arguments: dir (Direction) -- the Direction of the adjacent tile
             Returns:   An adjacent ListCoord to this object in the specified direction
         """
 
-        return self + ListCoord(dir=dir)
+        if dir is None:
+            raise ValueError('Too many NoneTypes passed to Coord constructor.')
+
+        dx, dy = DIR_VECS[dir]
+        return ListCoord._make(self.x+dx, self.y+dy)
     
     def is_in_bounds(self, nrows: int, ncols: int) -> bool:
         """Return whether this list coordinate is within the bounds of nrows and ncols."""
@@ -165,6 +191,8 @@ class FloatCoord(Coord):
     messy coding if we're being honest.
     """
 
+    __slots__ = ()
+
     def __init__(self,
                  x: CoordVal = None, y: CoordVal = None,
                  v: tuple[CoordVal, CoordVal] = None,
@@ -187,16 +215,27 @@ class FloatCoord(Coord):
 
         return None
     
+    def __add__(self, coord):
+        return FloatCoord._make(self.x+coord.x, self.y+coord.y)
+    
+    def __sub__(self, coord):
+        return FloatCoord._make(self.x-coord.x, self.y-coord.y)
+    
     def __mul__(self, scale: float):
-        return FloatCoord(self.x*scale, self.y*scale)
+        return FloatCoord._make(self.x*scale, self.y*scale)
     
     def midpoint_to(self, coord):
-        return FloatCoord((self.x+coord.x)/2, (self.y+coord.y)/2)
+        return FloatCoord._make((self.x+coord.x)/2, (self.y+coord.y)/2)
 
 CoordLike: TypeAlias = Union[Coord, list[CoordVal, CoordVal], tuple[CoordVal, CoordVal]]
 Block: TypeAlias = Union[tuple[CoordLike, CoordLike], list[CoordLike, CoordLike]]
 
 ZERO = FloatCoord(0, 0)
+HALF = FloatCoord(0.5, 0.5)
+
+# shared unit vectors for each Direction; use these instead of building FloatCoord(dir=d) on every
+# call, and never modify them in place
+DIR_COORDS = {d: FloatCoord(dir=d) for d in Direction}
 
 def main():
     test = ListCoord(4,5)
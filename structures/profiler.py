@@ -0,0 +1,102 @@
+#!/usr/bin/env python
+import os
+import csv
+import json
+import time
+from array import array
+
+class FrameProfiler:
+    """
+    Times the phases of each frame into a fixed-size ring buffer (the last `size` frames). Call
+    begin_frame() at the top of the loop and lap(i) right after phase i finishes; each lap records the
+    nanoseconds since the previous one. Phases skipped in a frame read as 0 for that frame.
+
+    Constructor accepts the phase names in the order they run and the number of frames to keep.
+    """
+
+    def __init__(self, phases: list[str], size: int = 1024) -> None:
+
+        self.phases = list(phases)
+        self.size = size
+        self.samples = array('q', [0]) * (size*len(self.phases))
+        self.totals = array('q', [0]) * size
+        self.nframes = 0
+
+        self.row = 0
+        self.frame_start, self.last = 0, 0
+
+    def begin_frame(self) -> None:
+
+        self.row = (self.nframes % self.size) * len(self.phases)
+        for i in range(len(self.phases)):
+            self.samples[self.row + i] = 0
+        self.frame_start = self.last = time.perf_counter_ns()
+
+    def lap(self, phase: int) -> None:
+
+        now = time.perf_counter_ns()
+        self.samples[self.row + phase] = now - self.last
+        self.last = now
+
+    def end_frame(self) -> None:
+
+        self.totals[self.nframes % self.size] = self.last - self.frame_start
+        self.nframes += 1
+
+    def get_stats(self, percentiles: tuple[int, ...] = (50, 95, 99)) -> dict[str, dict[str, float]]:
+        """
+        Returns:
+            {phase: {'p50': ms, ...}} (nearest-rank percentiles) over the frames still in the buffer,
+            plus a 'frame' entry for whole frames.
+        """
+
+        nrows = min(self.nframes, self.size)
+        columns = {phase: [self.samples[r*len(self.phases) + i] for r in range(nrows)]
+                   for i, phase in enumerate(self.phases)}
+        columns['frame'] = list(self.totals[:nrows])
+
+        stats = {}
+        for phase, times in columns.items():
+            times.sort()
+            stats[phase] = {f'p{p}': times[min(nrows-1, max(0, -(-p*nrows // 100) - 1))] / 1e6 if nrows else 0.0
+                            for p in percentiles}
+            stats[phase]['max'] = times[-1] / 1e6 if nrows else 0.0
+
+        return stats
+
+    def dump(self, path: os.PathLike) -> None:
+        """Write get_stats() to path, as CSV if it ends in .csv and JSON otherwise."""
+
+        stats = self.get_stats()
+
+        if path.endswith('.csv'):
+            with open(path, 'w', newline='') as f:
+                writer = csv.writer(f)
+                keys = list(next(iter(stats.values())))
+                writer.writerow(['phase'] + [f'{k}_ms' for k in keys])
+                for phase, row in stats.items():
+                    writer.writerow([phase] + [f'{row[k]:.4f}' for k in keys])
+        else:
+            with open(path, 'w') as f:
+                json.dump({'frames': min(self.nframes, self.size), 'unit': 'ms', 'phases': stats}, f, indent=1)
+
+class NullProfiler:
+    """Stand-in used when profiling is off, so the game loop's profiling calls cost next to nothing."""
+
+    def begin_frame(self) -> None: pass
+    def lap(self, phase: int) -> None: pass
+    def end_frame(self) -> None: pass
+
+def main():
+    print('You are runnning profiler.py as a python script')
+
+    prof = FrameProfiler(['sleep'], size=16)
+    for _ in range(20):
+        prof.begin_frame()
+        time.sleep(0.001)
+        prof.lap(0)
+        prof.end_frame()
+    print(prof.get_stats())
+
+if __name__ == '__main__':
+    main()
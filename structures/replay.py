@@ -0,0 +1,105 @@
+#!/usr/bin/env python
+import os, sys
+import struct
+from array import array
+
+from structures.position import *
+from structures.sim import Simulation
+
+# magic, frame rate, frames stepped, number of inputs, final score, death frame; followed by the final
+# (x, y) of pacman, blinky, pinky and inky, the frame of every input and the Direction index of every input
+HEADER = struct.Struct('<4sHIIIi')
+POSITIONS = struct.Struct('<8d')
+MAGIC = b'PMR1'
+DIRS = list(Direction)
+
+class Replay:
+    """
+    A recorded session: every input applied to the Simulation with the frame it was applied on, how many
+    frames were stepped in total, and the final state to check a replay against (see get_summary).
+    """
+
+    def __init__(self, frame_rate: int, nframes: int, inputs: list[tuple[int, Direction]], summary: dict) -> None:
+
+        self.frame_rate = frame_rate
+        self.nframes = nframes
+        self.inputs = inputs
+        self.summary = summary
+
+def get_summary(sim: Simulation) -> dict:
+    """Final score, death frame and (x, y) of every agent."""
+
+    return {'score': sim.pacman.score,
+            'death_frame': sim.death_frame,
+            'positions': [(a.pos.x, a.pos.y) for a in (sim.pacman, sim.blinky, sim.pinky, sim.inky)]}
+
+def save_replay(path: os.PathLike, sim: Simulation) -> None:
+    """Write the inputs a Simulation recorded (sim.input_log) and its current state to path."""
+
+    if sim.input_log is None:
+        raise RuntimeError('Simulation is not recording, set input_log to a list before playing.')
+
+    summary = get_summary(sim)
+    frames = array('I', [frame for frame, _ in sim.input_log])
+    dirs = bytes(DIRS.index(dir) for _, dir in sim.input_log)
+
+    with open(path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, sim.frame_rate, sim.nframes, len(dirs), summary['score'], summary['death_frame']))
+        f.write(POSITIONS.pack(*[v for xy in summary['positions'] for v in xy]))
+        f.write(frames.tobytes())
+        f.write(dirs)
+
+def load_replay(path: os.PathLike) -> Replay:
+
+    with open(path, 'rb') as f:
+        data = f.read()
+
+    magic, frame_rate, nframes, ninputs, score, death_frame = HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise ValueError('Not a recorded replay.')
+
+    offset = HEADER.size
+    positions = POSITIONS.unpack_from(data, offset)
+    offset += POSITIONS.size
+    frames = array('I', data[offset:offset + 4*ninputs])
+    offset += 4*ninputs
+    dirs = [DIRS[i] for i in data[offset:offset + ninputs]]
+
+    summary = {'score': score, 'death_frame': death_frame,
+               'positions': [(positions[2*i], positions[2*i+1]) for i in range(4)]}
+
+    return Replay(frame_rate, nframes, list(zip(frames, dirs)), summary)
+
+def replay(rec: Replay) -> Simulation:
+    """Run a recording through a headless Simulation as fast as possible. Returns the finished Simulation."""
+
+    sim = Simulation(frame_rate=rec.frame_rate)
+    sim.init()
+
+    for frame, dir in rec.inputs:
+        if frame > sim.nframes:
+            sim.step(n=frame-sim.nframes)
+        sim.step(dir)
+    if rec.nframes > sim.nframes:
+        sim.step(n=rec.nframes-sim.nframes)
+
+    return sim
+
+def main():
+
+    if len(sys.argv) < 2:
+        sys.exit('usage: python -m structures.replay REPLAY [REPLAY ...]')
+
+    failed = False
+    for path in sys.argv[1:]:
+        rec = load_replay(path)
+        summary = get_summary(replay(rec))
+        ok = summary == rec.summary
+        failed |= not ok
+        print(f'{path}: {rec.nframes} frames, {len(rec.inputs)} inputs, score {summary["score"]}, '
+              f'death frame {summary["death_frame"]} -- {"matches" if ok else "DIFFERS FROM"} recording')
+
+    sys.exit(1 if failed else 0)
+
+if __name__ == '__main__':
+    main()
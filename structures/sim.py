@@ -0,0 +1,301 @@
+#!/usr/bin/env python
+import os
+import copy
+import math
+from enum import Enum
+from typing import Sequence, Union
+
+from structures.maze import *
+from structures.position import *
+from structures.agent import Player, Enemy
+from structures.collision import CollisionGrid
+
+class GhostMode(Enum):
+    CHASE, SCATTER = 0, 1
+
+Inputs = Union[Direction, None, Sequence[Union[Direction, None]]]
+
+# Simulation.snapshot(): (frame state, board state from Maze.get_state, player state, ghost states), all
+# plain immutable values. The layouts of the parts are fixed by _get_player_state/_get_ghost_state.
+Snapshot = tuple
+
+class Simulation:
+    """
+    Headless game state. Owns the maze, the agents and the ghost mode/siren schedules, and advances
+    them one fixed timestep at a time through step(). Nothing in here touches the display, the clock
+    or the audio device, so it can be stepped as fast as the CPU allows.
+
+    Constructor accepts an optional gfx_path (the directory holding the pacman/ghost sprite folders).
+    Leave it as None to run without loading any images.
+    """
+
+    def __init__(self, gfx_path: os.PathLike = None, frame_rate: int = 60) -> None:
+
+        self.gfx_path = gfx_path
+        self.frame_rate = frame_rate
+        self.initialized = False
+
+        # ghost mode + siren schedules (in seconds of game time)
+        self.MODES = list(GhostMode)
+        self.mode_ind = 1
+        self.mode_changes = [7, 27, 34, 54, 59, 79, 84, math.inf]
+        self.next_mode_change = 0
+        self.siren_changes = [7, 34, 59, 84, math.inf]
+        self.next_siren_change = 0
+
+        # game objects
+        self.maze, self.pacman = None, None
+        self.blinky, self.pinky, self.inky = None, None, None
+        self.blinky_corner, self.pinky_corner = None, None
+        self.collisions = CollisionGrid(radius=0.5)
+
+        self.nframes = 0
+        self.playing = False
+        self.death_frame = -1
+
+        # set to a list to record (frame, Direction) for every input applied (see structures/replay.py)
+        self.input_log = None
+
+    def _get_gfx(self, name: str) -> os.PathLike:
+        return None if self.gfx_path is None else os.path.join(self.gfx_path, name)
+
+    def _init_game_objects(self) -> None:
+
+        self.maze = Maze()
+        self.maze.init()
+
+        self.pacman = Player(self._get_gfx('pacman'),
+                             (self.maze.ncols//2-1,self.maze.nrows-8),
+                             speed_vec=(1,0),
+                             speed_norm=0.15)
+        self.pacman.pos.x += 0.5
+
+        self.blinky = Enemy(self._get_gfx('blinky'),
+                            (self.maze.ncols//2-1,11),
+                            speed_vec=(1,0),
+                            speed_norm=0.15)
+        self.blinky.pos.x += 0.5
+        self.blinky.at_home = False
+        self.blinky.waiting = False
+        self.blinky.passable_tiles = list(GHOST_TILES)
+
+        self.pinky = Enemy(self._get_gfx('pinky'),
+                           (self.maze.ncols//2-1,14),
+                           speed_vec=(0,-1),
+                           speed_norm=0.15)
+        self.pinky.pos.x += 0.5
+        self.pinky.waiting = False
+
+        self.inky = Enemy(self._get_gfx('inky'),
+                          (self.maze.ncols//2-2,14),
+                          speed_vec=(0,-1),
+                          speed_norm=0.15)
+        self.inky.pos.x -= 0.5
+        self.inky.pos.y -= 0.5
+        self.inky.target = ListCoord(0, self.maze.nrows-1)
+
+        # scatter targets, built once and shared across frames
+        self.blinky_corner = ListCoord(self.maze.ncols-1, -1)
+        self.pinky_corner = ListCoord(0, -1)
+
+    def init(self) -> None:
+        """Build a fresh maze and agents and rewind all schedules. Can be called again to reset."""
+
+        self._init_game_objects()
+
+        self.mode_ind = 1
+        self.next_mode_change = 0
+        self.next_siren_change = 0
+        self.nframes = 0
+        self.playing = True
+        self.death_frame = -1
+        if not self.input_log is None:
+            self.input_log = []
+        self.initialized = True
+
+    def get_mode(self) -> GhostMode:
+        return self.MODES[self.mode_ind]
+
+    def set_input(self, dir: Direction) -> None:
+        """Queue a direction change for the player. None leaves the current request in place."""
+
+        if not dir is None:
+            self.pacman.next_speed = DIR_COORDS[dir]
+            if not self.input_log is None:
+                self.input_log.append((self.nframes, dir))
+
+    def step(self, inputs: Inputs = None, n: int = 1) -> bool:
+        """
+        Arguments:
+            inputs (Inputs) -- (optional; default=None) either a single Direction (or None) queued before
+                               the first frame, or a sequence holding one Direction/None per frame
+            n (int)         -- (optional; default=1) number of frames to advance
+
+        Returns:
+            Whether the game is still being played after the last frame.
+        """
+
+        if not self.initialized:
+            raise RuntimeError('Simulation not yet initialized, method step unavailable.')
+
+        if inputs is None or isinstance(inputs, Direction):
+            self.set_input(inputs)
+            for _ in range(n):
+                self._step_frame()
+        else:
+            if len(inputs) != n:
+                raise ValueError('Number of per-frame inputs does not match number of frames.')
+            for dir in inputs:
+                self.set_input(dir)
+                self._step_frame()
+
+        return self.playing
+
+    def _step_frame(self) -> None:
+
+        self.nframes += 1
+
+        if self.next_siren_change < len(self.siren_changes) \
+            and self.nframes >= self.siren_changes[self.next_siren_change]*self.frame_rate:
+            self.next_siren_change += 1
+
+        if not self.playing:
+            return
+
+        self.pacman.update_pos(self.maze)
+
+        if self.get_mode() == GhostMode.CHASE:
+            self.blinky.target = self.pacman.list_pos
+            pos, speed = self.pacman.pos, self.pacman.speed_vec
+            self.pinky.target = ListCoord(pos.x+speed.x*4, pos.y+speed.y*4)
+        else:
+            self.blinky.target = self.blinky_corner
+            self.pinky.target = self.pinky_corner
+
+        self.blinky.update_speed(self.maze)
+        self.blinky.move(self.maze)
+        self.pinky.update_speed(self.maze)
+        self.pinky.move(self.maze, correct_pos=(not self.pinky.at_home))
+        self.inky.update_speed(self.maze)
+        self.inky.move(self.maze, correct_pos=(not self.inky.at_home))
+
+        if self.next_mode_change < len(self.mode_changes) \
+            and self.nframes >= self.frame_rate*self.mode_changes[self.next_mode_change]:
+            self.mode_ind = (self.mode_ind+1) % 2
+            self.next_mode_change += 1
+        # the player is agent 0, so any pair starting with 0 is a ghost catching it
+        pairs = self.collisions.get_pairs([self.pacman, self.blinky, self.pinky, self.inky])
+        if pairs and pairs[0][0] == 0:
+            self.kill_player()
+
+    # ================== SNAPSHOTS ==================
+
+    @staticmethod
+    def _get_player_state(p: Player) -> tuple:
+
+        next_speed = None if p.next_speed is None else (p.next_speed.x, p.next_speed.y)
+
+        return (p.pos.x, p.pos.y, p.list_pos.x, p.list_pos.y, p.speed_vec.x, p.speed_vec.y, next_speed,
+                p.is_moving, p.eating, p.last_dot.x, p.last_dot.y, p.score)
+
+    @staticmethod
+    def _get_ghost_state(g: Enemy) -> tuple:
+
+        return (g.pos.x, g.pos.y, g.list_pos.x, g.list_pos.y, g.speed_vec.x, g.speed_vec.y,
+                g.target.x, g.target.y, g.at_home, g.waiting, g.last_turn_pos.x, g.last_turn_pos.y,
+                g.passable_bits, tuple(g.passable_tiles))
+
+    def snapshot(self) -> Snapshot:
+        """
+        Returns:
+            (Snapshot) -- immutable copy of the simulation data only (no images): board, agents, score,
+                          frame counter and schedules. The board is shared with earlier snapshots until a
+                          dot is eaten, so snapshots along a branch cost a few microseconds.
+        """
+
+        if not self.initialized:
+            raise RuntimeError('Simulation not yet initialized, method snapshot unavailable.')
+
+        frame = (self.nframes, self.playing, self.death_frame, self.mode_ind, self.next_mode_change,
+                 self.next_siren_change, None if self.input_log is None else len(self.input_log))
+        ghosts = tuple(self._get_ghost_state(g) for g in (self.blinky, self.pinky, self.inky))
+
+        return (frame, self.maze.get_state(), self._get_player_state(self.pacman), ghosts)
+
+    def restore(self, snapshot: Snapshot) -> None:
+        """Rewind (or fast-forward) to a snapshot taken from this Simulation or one of its clones."""
+
+        if not self.initialized:
+            raise RuntimeError('Simulation not yet initialized, method restore unavailable.')
+
+        frame, board, player, ghosts = snapshot
+        (self.nframes, self.playing, self.death_frame, self.mode_ind, self.next_mode_change,
+         self.next_siren_change, nlog) = frame
+        if not self.input_log is None and not nlog is None:
+            del self.input_log[nlog:]
+
+        self.maze.set_state(board)
+
+        # positions are updated in place (other objects may alias them, e.g. blinky's chase target is
+        # pacman's list_pos); speeds and targets are rebound, since they can alias shared constants
+        p = self.pacman
+        p.pos.x, p.pos.y, p.list_pos.x, p.list_pos.y, sx, sy, next_speed, \
+            p.is_moving, p.eating, p.last_dot.x, p.last_dot.y, p.score = player
+        p.speed_vec = FloatCoord._make(sx, sy)
+        p.next_speed = None if next_speed is None else FloatCoord._make(*next_speed)
+
+        for g, state in zip((self.blinky, self.pinky, self.inky), ghosts):
+            g.pos.x, g.pos.y, g.list_pos.x, g.list_pos.y, sx, sy, tx, ty, \
+                g.at_home, g.waiting, g.last_turn_pos.x, g.last_turn_pos.y, bits, tiles = state
+            g.speed_vec = FloatCoord._make(sx, sy)
+            g.target = ListCoord._make(tx, ty)
+            if g.passable_bits != bits:
+                g.passable_tiles = list(tiles)
+
+    def clone(self) -> 'Simulation':
+        """
+        Independent copy of the simulation data, e.g. to step branches side by side. Images are shared,
+        the maze's cached tables are shared until either copy changes passability.
+        """
+
+        if not self.initialized:
+            raise RuntimeError('Simulation not yet initialized, method clone unavailable.')
+
+        sim = copy.copy(self)
+        sim.maze = self.maze.copy()
+        # schedules are plain lists, so an in-place edit on one branch would otherwise show up in the other
+        sim.MODES = list(self.MODES)
+        sim.mode_changes, sim.siren_changes = list(self.mode_changes), list(self.siren_changes)
+        if not self.input_log is None:
+            sim.input_log = list(self.input_log)
+
+        # fresh coords for everything restore() updates in place
+        sim.pacman = copy.copy(self.pacman)
+        sim.pacman.last_dot = ListCoord(0, 0)
+        sim.blinky, sim.pinky, sim.inky = [copy.copy(g) for g in (self.blinky, self.pinky, self.inky)]
+        for g in (sim.pacman, sim.blinky, sim.pinky, sim.inky):
+            g.pos, g.list_pos = FloatCoord(0, 0), ListCoord(0, 0)
+        for g in (sim.blinky, sim.pinky, sim.inky):
+            g.last_turn_pos = ListCoord(0, 0)
+
+        sim.restore(self.snapshot())
+
+        return sim
+
+    def kill_player(self) -> None:
+        """End play on the current frame. Rendering/audio layers react to the playing flag."""
+
+        self.pacman.eating = False
+        self.death_frame = self.nframes
+        self.playing = False
+
+def main():
+    print('You are runnning sim.py as a python script')
+
+    sim = Simulation()
+    sim.init()
+    sim.step(n=600)
+    print(f'frame {sim.nframes}: score {sim.pacman.score}, playing {sim.playing}')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,153 @@
+#!/usr/bin/env python
+import numpy as np
+
+from structures.maze import *
+from structures.position import *
+from structures.batch import DIR_VECS, REVERSE, POPCOUNT, get_dirs, get_in_tunnel, move_agents, get_best_turns
+
+class EnemySwarm:
+    """
+    Any number of ghosts in one maze, kept as parallel arrays rather than Enemy objects: (n, 2) positions,
+    list positions, speeds, targets and last turn tiles, and (n,) headings, home/waiting flags and speed
+    norms. update() applies Enemy.update_speed followed by Enemy.move to every ghost in one batched pass.
+    Ghosts carry no images; drawing them is up to the caller.
+
+    Constructor accepts the number of ghosts, their speed and the slowdown applied in the tunnel and
+    while waiting in the house.
+    """
+
+    def __init__(self, size: int, speed_norm: float = 1, speed_reduction: float = 0.6) -> None:
+
+        self.size = size
+        self.maze = None
+        self.initialized = False
+
+        self.pos, self.list_pos, self.speed, self.heading = None, None, None, None
+        self.speed_norm = np.full(size, speed_norm, dtype=np.float64)
+        self.slow_norm = self.speed_norm*speed_reduction
+        self.target, self.last_turn = None, None
+        self.at_home, self.waiting = None, None
+
+    def init(self, maze: Maze, list_pos, speed_vec=(0, -1), target=(0, 0), at_home=True, waiting=True) -> None:
+        """
+        Arguments:
+            maze (Maze)    -- maze the swarm moves in (its open-direction tables are read on every update,
+                              so passability changes are picked up)
+            list_pos       -- (n, 2) starting tiles, or one (x, y) for every ghost
+            speed_vec      -- (optional; default=(0, -1)) (n, 2) starting speeds or one for every ghost
+            target         -- (optional; default=(0, 0)) (n, 2) target tiles or one for every ghost
+            at_home        -- (optional; default=True) (n,) flags or one for every ghost
+            waiting        -- (optional; default=True) (n,) flags or one for every ghost
+        """
+
+        def per_ghost(values, dtype, shape):
+            return np.array(np.broadcast_to(np.asarray(values, dtype=dtype), shape))
+
+        n = self.size
+        self.maze = maze
+        self.list_pos = per_ghost(list_pos, np.int64, (n, 2))
+        self.pos = self.list_pos.astype(np.float64)
+        self.speed = per_ghost(speed_vec, np.float64, (n, 2))
+        self.heading = get_dirs(self.speed)
+        self.target = per_ghost(target, np.int64, (n, 2))
+        self.last_turn = np.zeros((n, 2), dtype=np.int64)
+        self.at_home = per_ghost(at_home, bool, (n,))
+        self.waiting = per_ghost(waiting, bool, (n,))
+        self.initialized = True
+
+    @classmethod
+    def from_enemies(cls, maze: Maze, enemies: list) -> 'EnemySwarm':
+        """Swarm holding the current state of a list of Enemy objects."""
+
+        swarm = cls(len(enemies))
+        swarm.init(maze, [e.list_pos.get_tuple() for e in enemies], [e.speed_vec.get_tuple() for e in enemies],
+                   [e.target.get_tuple() for e in enemies], [e.at_home for e in enemies],
+                   [e.waiting for e in enemies])
+        swarm.pos[:] = [e.pos.get_tuple() for e in enemies]
+        swarm.speed_norm[:] = [e.speed_norm for e in enemies]
+        swarm.slow_norm[:] = [e.slow_norm for e in enemies]
+        swarm.last_turn[:] = [e.last_turn_pos.get_tuple() for e in enemies]
+
+        return swarm
+
+    def _get_open(self, tiles: Sequence[Tile], list_pos: np.ndarray) -> np.ndarray:
+        """Open-direction masks (junction bit cleared) for an (n, 2) array of list positions."""
+
+        table = np.frombuffer(self.maze.get_open_dirs(get_tile_bits(tiles)), dtype=np.uint8)
+        ncols = self.maze.ncols + 2*OPEN_PAD
+        idx = (list_pos[:, 1]+OPEN_PAD)*ncols + list_pos[:, 0]+OPEN_PAD
+
+        return np.take(table, idx).astype(np.int64) & (JUNCTION-1)
+
+    def update(self, active: np.ndarray = None) -> None:
+        """
+        Arguments: active (np.ndarray) -- (optional; default=None) (n,) mask of the ghosts to update,
+                                          all of them when None
+        """
+
+        if not self.initialized:
+            raise RuntimeError('EnemySwarm not yet initialized, method update unavailable.')
+
+        if active is None:
+            active = np.ones(self.size, dtype=bool)
+        maze, list_pos = self.maze, self.list_pos
+
+        # waiting ghosts bounce around inside the house
+        waiting = active & self.at_home & self.waiting
+        if waiting.any():
+            wg = np.flatnonzero(waiting)
+            stuck = (self._get_open(HOME_TILES, list_pos[wg]) >> self.heading[wg]) & 1 == 0
+            sg = wg[stuck]
+            self.speed[sg] *= -1
+            self.heading[sg] = REVERSE[self.heading[sg]]
+
+        if not maze.exit is None:
+            leaving = active & self.at_home & (list_pos[:, 0] == maze.exit.x) & (list_pos[:, 1] == maze.exit.y)
+            self.at_home[leaving] = False
+
+        # junction steering for ghosts outside the house
+        og = np.flatnonzero(active & ~self.at_home)
+        if len(og):
+            open_dirs = self._get_open(GHOST_TILES, list_pos[og])
+            dirs = self.heading[og]
+            blocked = (open_dirs >> dirs) & 1 == 0
+            moved = (list_pos[og, 0] != self.last_turn[og, 0]) | (list_pos[og, 1] != self.last_turn[og, 1])
+            deciding = (blocked | (POPCOUNT[open_dirs] > 2)) & moved
+
+            dg = og[deciding]
+            if len(dg):
+                best = get_best_turns(list_pos[dg], dirs[deciding], open_dirs[deciding], self.target[dg],
+                                      maze.nrows, maze.ncols)
+                self.speed[dg] = DIR_VECS[best]
+                self.heading[dg] = best
+                self.last_turn[dg] = list_pos[dg]
+
+        # Enemy.move; only ghosts outside the house are snapped to their lane
+        slow = get_in_tunnel(list_pos, maze.tunnel_rows) | self.waiting
+        norm = np.where(slow, self.slow_norm, self.speed_norm)
+        move_agents(self.pos, list_pos, self.speed, self.heading, norm, ~self.at_home, active,
+                    maze.nrows, maze.ncols)
+
+def main():
+    print('You are runnning swarm.py as a python script')
+
+    import time
+
+    maze = Maze()
+    maze.init()
+    free = [(c, r) for r in range(maze.nrows) for c in range(maze.ncols) if maze.get_tile_rc(r, c) in GHOST_TILES]
+
+    rng = np.random.default_rng(0)
+    swarm = EnemySwarm(1000, speed_norm=0.15)
+    swarm.init(maze, np.array(free)[rng.integers(len(free), size=swarm.size)], speed_vec=(1, 0),
+               target=np.array(free)[rng.integers(len(free), size=swarm.size)], at_home=False, waiting=False)
+
+    start = time.perf_counter()
+    for _ in range(600):
+        swarm.update()
+    elapsed = time.perf_counter() - start
+    print(f'{swarm.size} ghosts, 600 frames: {elapsed/600*1000:.3f} ms per frame, '
+          f'{elapsed/600/swarm.size*1e9:.0f} ns per ghost')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,207 @@
+#!/usr/bin/env python
+"""
+Runs many headless games with a scripted or bot player across a process pool and summarises the score,
+survival and death cause distributions, e.g. to tune ghost timings and speeds. Per-game results go to a CSV.
+
+    python -m structures.tournament [--games 1000] [--jobs N] [--bot greedy] [--out tournament.csv]
+                                    [--mode-changes 7,27,34,54,59,79,84] [--ghost-speed 0.15]
+                                    [--speed-reduction 0.6]
+"""
+import os, sys
+import csv
+import math
+import random
+import argparse
+import statistics
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from structures.maze import *
+from structures.position import *
+from structures.sim import Simulation
+
+GHOST_NAMES = ('blinky', 'pinky', 'inky')
+FIELDS = ['game', 'seed', 'score', 'frames', 'cause']
+PLAYER_BITS = get_tile_bits(PLAYER_TILES)
+SPEED_REDUCTION = 0.6 # Enemy's default tunnel/waiting speed factor
+
+# ================== PLAYERS ==================
+# a bot is called once per frame with the Simulation and the game's own Random, and returns a
+# Direction to queue (or None to keep the current request)
+
+def idle_bot(sim: Simulation, rng: random.Random) -> Direction:
+    return None
+
+def random_bot(sim: Simulation, rng: random.Random) -> Direction:
+    """Picks a new direction now and then."""
+
+    return rng.choice(OPEN_DIRS) if rng.random() < 0.05 else None
+
+def greedy_bot(sim: Simulation, rng: random.Random) -> Direction:
+    """
+    Follows the maze's flow field towards the closest dot (straight-line), ignoring the ghosts. Takes a
+    random turn now and then so that different seeds give different games.
+    """
+
+    if sim.maze.is_cleared():
+        return None
+    if rng.random() < 0.02:
+        return rng.choice(OPEN_DIRS)
+
+    # steer from the tile pacman is closest to; list_pos rounds by heading, so it flips when reversing
+    pos = ListCoord(round(sim.pacman.pos.x), round(sim.pacman.pos.y))
+    r, c = min(sim.maze.dots, key=lambda rc: (rc[0]-pos.y)**2 + (rc[1]-pos.x)**2)
+
+    return sim.maze.get_flow_dir(pos, ListCoord(c, r), PLAYER_BITS)
+
+BOTS = {'idle': idle_bot, 'random': random_bot, 'greedy': greedy_bot}
+
+# ================== WORKERS ==================
+
+# per-process state, set up once by init_worker and reused for every game the process plays
+_worker = {}
+
+def apply_settings(sim: Simulation, settings: dict) -> None:
+    """Override the ghost mode schedule and ghost speeds of an initialized Simulation."""
+
+    if not settings.get('mode_changes') is None:
+        sim.mode_changes = list(settings['mode_changes']) + [math.inf]
+
+    reduction = SPEED_REDUCTION if settings.get('speed_reduction') is None else settings['speed_reduction']
+    for g in (sim.blinky, sim.pinky, sim.inky):
+        if not settings.get('ghost_speed') is None:
+            g.speed_norm = settings['ghost_speed']
+        # the slow speed follows the ghost speed even when only one of the two is overridden
+        g.slow_norm = g.speed_norm*reduction
+
+def init_worker(settings: dict) -> None:
+    """Build this process's Simulation (maze and its tables stay warm) and the snapshot every game starts from."""
+
+    sim = Simulation()
+    sim.init()
+    apply_settings(sim, settings)
+    _worker.update(sim=sim, start=sim.snapshot(), settings=settings)
+
+def play_game(game: int, seed: int) -> tuple:
+    """Play one game on this worker's Simulation. Returns a row of FIELDS."""
+
+    sim, settings = _worker['sim'], _worker['settings']
+    sim.restore(_worker['start'])
+    bot, rng = BOTS[settings['bot']], random.Random(seed)
+
+    cause = 'timeout'
+    while sim.nframes < settings['max_frames']:
+        if not sim.step(bot(sim, rng)):
+            pairs = sim.collisions.get_pairs([sim.pacman, sim.blinky, sim.pinky, sim.inky])
+            cause = GHOST_NAMES[pairs[0][1]-1] if pairs and pairs[0][0] == 0 else 'unknown'
+            break
+        if sim.maze.is_cleared():
+            cause = 'cleared'
+            break
+
+    return (game, seed, sim.pacman.score, sim.nframes, cause)
+
+def play_chunk(games: list[tuple[int, int]]) -> list[tuple]:
+    """Play a chunk of (game, seed) pairs, sent back to the runner as one batch of rows."""
+
+    return [play_game(game, seed) for game, seed in games]
+
+# ================== RUNNER ==================
+
+def get_percentile(values: list, p: int) -> float:
+    """Nearest-rank percentile of already sorted values."""
+
+    return values[min(len(values)-1, max(0, -(-p*len(values) // 100) - 1))]
+
+def summarize(rows: list[tuple]) -> dict:
+    """Score and survival distributions (mean, p10/p50/p90, min/max) and death cause counts over result rows."""
+
+    summary = {'games': len(rows)}
+    for name, col in (('score', 2), ('frames', 3)):
+        values = sorted(row[col] for row in rows)
+        summary[name] = {'mean': statistics.fmean(values), 'min': values[0], 'max': values[-1],
+                         **{f'p{p}': get_percentile(values, p) for p in (10, 50, 90)}}
+    summary['causes'] = {}
+    for row in rows:
+        summary['causes'][row[4]] = summary['causes'].get(row[4], 0) + 1
+
+    return summary
+
+def run(settings: dict, ngames: int, jobs: int = None, chunk_size: int = 16, seed: int = 0,
+        out: os.PathLike = None) -> list[tuple]:
+    """
+    Arguments:
+        settings (dict)  -- bot name, max_frames and the overrides taken by apply_settings
+        ngames (int)     -- number of games to play
+        jobs (int)       -- (optional; default=None) worker processes, one per CPU when None, 1 to play
+                            in this process
+        chunk_size (int) -- (optional; default=16) games handed to a worker (and streamed back) at a time
+        seed (int)       -- (optional; default=0) game i is played with seed+i, whatever the worker count
+        out (PathLike)   -- (optional; default=None) CSV file rows are written to as chunks finish
+
+    Returns:
+        Every result row, in game order.
+    """
+
+    games = [(i, seed+i) for i in range(ngames)]
+    chunks = [games[i:i+chunk_size] for i in range(0, ngames, chunk_size)]
+
+    f = None if out is None else open(out, 'w', newline='')
+    writer = None if f is None else csv.writer(f)
+    if not writer is None:
+        writer.writerow(FIELDS)
+
+    rows = []
+    def collect(chunk_rows):
+        rows.extend(chunk_rows)
+        if not writer is None:
+            writer.writerows(chunk_rows)
+        print(f'\r{len(rows)}/{ngames} games', end='', file=sys.stderr, flush=True)
+
+    try:
+        if jobs == 1:
+            init_worker(settings)
+            for chunk in chunks:
+                collect(play_chunk(chunk))
+        else:
+            with ProcessPoolExecutor(max_workers=jobs, initializer=init_worker, initargs=(settings,)) as pool:
+                for future in as_completed([pool.submit(play_chunk, chunk) for chunk in chunks]):
+                    collect(future.result())
+    finally:
+        print(file=sys.stderr)
+        if not f is None:
+            f.close()
+
+    rows.sort()
+
+    return rows
+
+def main():
+
+    parser = argparse.ArgumentParser(description='Play many headless games and summarise the results.')
+    parser.add_argument('--games', type=int, default=1000, help='number of games')
+    parser.add_argument('--jobs', type=int, default=None, help='worker processes (default: one per CPU)')
+    parser.add_argument('--chunk-size', type=int, default=16, help='games per batch sent to a worker')
+    parser.add_argument('--bot', choices=list(BOTS), default='greedy', help='player')
+    parser.add_argument('--seed', type=int, default=0, help='seed of the first game')
+    parser.add_argument('--max-frames', type=int, default=60*120, help='frames before a game counts as a timeout')
+    parser.add_argument('--mode-changes', default=None, help='comma-separated ghost mode change times in seconds')
+    parser.add_argument('--ghost-speed', type=float, default=None, help='ghost speed in tiles per frame')
+    parser.add_argument('--speed-reduction', type=float, default=None,
+                        help='ghost speed factor in the tunnel and the house')
+    parser.add_argument('--out', default='tournament.csv', help='per-game results CSV')
+    args = parser.parse_args()
+
+    settings = {'bot': args.bot, 'max_frames': args.max_frames, 'ghost_speed': args.ghost_speed,
+                'speed_reduction': args.speed_reduction,
+                'mode_changes': None if args.mode_changes is None else [float(t) for t in args.mode_changes.split(',')]}
+
+    summary = summarize(run(settings, args.games, args.jobs, args.chunk_size, args.seed, args.out))
+
+    print(f'{summary["games"]} games ({args.bot} bot), results in {args.out}')
+    for name in ('score', 'frames'):
+        print(f'{name:<8}' + '  '.join(f'{k} {v:.1f}' if isinstance(v, float) else f'{k} {v}'
+                                       for k, v in summary[name].items()))
+    print('causes  ' + '  '.join(f'{cause} {n}' for cause, n in sorted(summary['causes'].items())))
+
+if __name__ == '__main__':
+    main()
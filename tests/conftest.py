@@ -0,0 +1,17 @@
+#!/usr/bin/env python
+import pytest
+
+from structures.maze import *
+from structures.layout import compile_layout
+
+@pytest.fixture
+def shifted_maze() -> Maze:
+    """The classic board with two wall rows added on top, moving its tunnel (row 16) and ghost house down."""
+
+    with open(CLASSIC_LAYOUT) as f:
+        rows = f.read().split()
+
+    maze = Maze()
+    maze.load(compile_layout('\n'.join(['E'*len(rows[0])]*2 + rows)))
+
+    return maze
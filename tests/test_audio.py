@@ -0,0 +1,30 @@
+#!/usr/bin/env python
+import os
+import sys
+import wave
+
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+from structures.audio import Audio
+
+def write_wav(path: os.PathLike, nchannels: int, width: int, rate: int, nframes: int = 100) -> None:
+    with wave.open(str(path), 'wb') as w:
+        w.setnchannels(nchannels)
+        w.setsampwidth(width)
+        w.setframerate(rate)
+        w.writeframes(bytes(nframes*nchannels*width))
+
+def test_falls_back_to_silent_without_audioop(tmp_path, monkeypatch):
+    # the second file doesn't match the mixer format (taken from the first), so it needs audioop
+    write_wav(tmp_path / 'a.wav', 1, 2, 22050)
+    write_wav(tmp_path / 'b.wav', 2, 2, 22050)
+    monkeypatch.setitem(sys.modules, 'audioop', None) # import audioop now raises ImportError
+
+    audio = Audio(tmp_path)
+    audio.init()
+    try:
+        assert audio.is_silent()
+        audio.play('b')
+        assert not audio.is_playing('b')
+    finally:
+        audio.quit()
@@ -0,0 +1,32 @@
+#!/usr/bin/env python
+import random
+
+import numpy as np
+
+from structures.maze import *
+from structures.sim import Simulation
+from structures.batch import BatchSimulation, DIR_INDEX, NO_DIR
+
+def get_inputs(seed: int, nframes: int) -> list:
+    rng = random.Random(seed)
+    return [rng.choice(OPEN_DIRS) if rng.random() < 0.05 else None for _ in range(nframes)]
+
+def test_batch_matches_simulation():
+    for seed in range(3):
+        sim = Simulation()
+        sim.init()
+        batch = BatchSimulation(1)
+        batch.init()
+        agents = (sim.pacman, sim.blinky, sim.pinky, sim.inky)
+
+        for dir in get_inputs(seed, 3000):
+            playing = sim.step(dir)
+            batch.step(np.array([NO_DIR if dir is None else DIR_INDEX[dir]]))
+
+            assert batch.pos[0].tolist() == [list(a.pos.get_tuple()) for a in agents], (seed, sim.nframes)
+            assert batch.list_pos[0].tolist() == [list(a.list_pos.get_tuple()) for a in agents], (seed, sim.nframes)
+            assert batch.score[0] == sim.pacman.score, (seed, sim.nframes)
+            assert batch.death_frame[0] == sim.death_frame, (seed, sim.nframes)
+            assert batch.playing[0] == playing, (seed, sim.nframes)
+            if not playing:
+                break
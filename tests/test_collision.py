@@ -0,0 +1,35 @@
+#!/usr/bin/env python
+import random
+
+from structures.position import *
+from structures.collision import CollisionGrid
+
+def get_brute_pairs(agents: list[FloatCoord], radius: float) -> list[tuple[int, int]]:
+    return [(i, j) for i in range(len(agents)) for j in range(i+1, len(agents))
+            if agents[i].dist_from(agents[j]) <= radius]
+
+def test_pairs_match_brute_force():
+    rng = random.Random(0)
+    for radius in (0.5, 1.0, 1.7):
+        grid = CollisionGrid(radius)
+        for _ in range(50):
+            # a crowded patch (many agents in neighbouring cells), plus agents on cell boundaries and at
+            # exactly the radius apart
+            agents = [FloatCoord(rng.uniform(-1, 6), rng.uniform(-1, 6)) for _ in range(40)]
+            agents += [FloatCoord(rng.randrange(-2, 8)*grid.cell, rng.randrange(-2, 8)*grid.cell/2) for _ in range(20)]
+            agents += [FloatCoord(a.x + radius, a.y) for a in agents[:5]] + [FloatCoord(a.x, a.y - radius) for a in agents[5:10]]
+            rng.shuffle(agents)
+            assert grid.get_pairs(agents) == get_brute_pairs(agents, radius)
+
+def test_player_pair_comes_first():
+    grid = CollisionGrid()
+    # the ghosts collide with each other as well as with the player (index 0), who is in another cell
+    agents = [FloatCoord(2.9, 5), FloatCoord(3.1, 5), FloatCoord(3.2, 5), FloatCoord(3.3, 5)]
+    pairs = grid.get_pairs(agents)
+
+    assert pairs == get_brute_pairs(agents, 0.5)
+    assert pairs[0][0] == 0
+
+    # no player pair at all
+    agents[0] = FloatCoord(0, 0)
+    assert all(i != 0 for i, _ in grid.get_pairs(agents))
@@ -0,0 +1,121 @@
+#!/usr/bin/env python
+import numpy as np
+
+from structures.maze import *
+from structures.position import *
+from structures.env import PacmanEnv, VecPacmanEnv, ACTIONS, NO_ACTION, NAGENTS, get_cells
+from structures.batch import PACMAN
+
+PLAYER_BITS = get_tile_bits(PLAYER_TILES)
+HOUSE = (13, 14) # (x, y) of a tile inside the ghost house
+
+def freeze_ghosts(sim) -> None:
+    """Park the ghosts in the house, where they can't reach the player, so a game can run to the end."""
+
+    for g in (sim.blinky, sim.pinky, sim.inky):
+        g.speed_norm = g.slow_norm = 0
+        g.at_home, g.waiting = True, False
+        g.pos.x, g.pos.y = HOUSE
+        g.list_pos.x, g.list_pos.y = HOUSE
+
+def freeze_batch_ghosts(batch) -> None:
+
+    batch.speed_norm[:, PACMAN+1:] = batch.slow_norm[:, PACMAN+1:] = 0
+    batch.at_home[:, PACMAN+1:], batch.waiting[:, PACMAN+1:] = True, False
+    batch.pos[:, PACMAN+1:] = HOUSE
+    batch.list_pos[:, PACMAN+1:] = HOUSE
+
+def get_action(maze: Maze, pos: np.ndarray, target: tuple[int, int]) -> int:
+    """Action along the shortest path from the tile nearest pos to the (row, column) target."""
+
+    dir = maze.get_flow_dir(ListCoord(round(pos[0]), round(pos[1])), ListCoord(target[1], target[0]), PLAYER_BITS)
+
+    return NO_ACTION if dir is None else ACTIONS.index(dir)
+
+def check_planes(env: PacmanEnv) -> None:
+
+    maze = env.sim.maze
+    list_pos = np.array([a.list_pos.get_tuple() for a in env.agents])
+    rows, cols = get_cells(list_pos, maze.nrows, maze.ncols)
+    planes = env.obs['agents']
+    for i in range(NAGENTS):
+        assert planes[i].sum() == 1 and planes[i, rows[i], cols[i]] == 1, i
+
+def test_reset_restores_start():
+    env = PacmanEnv(max_frames=2000)
+    obs = env.reset(seed=0)
+    start = {k: v.copy() for k, v in obs.items()}
+    snapshot = env.sim.snapshot()
+
+    done, rng = False, np.random.default_rng(0)
+    while not done:
+        obs, reward, done, info = env.step(rng.integers(len(ACTIONS)+1))
+    assert info['frame'] > 0 and not np.array_equal(obs['pos'], start['pos'])
+
+    obs = env.reset(seed=0)
+    assert all(np.array_equal(obs[k], start[k]) for k in start)
+    assert env.sim.snapshot() == snapshot and env.last_score == 0
+
+def test_planes_follow_tunnel_wraps():
+    env = PacmanEnv()
+    obs = env.reset()
+    freeze_ghosts(env.sim)
+    maze, pacman = env.sim.maze, env.sim.pacman
+
+    # run into the tunnel, then keep going west out of the left edge and back in from the right
+    xs = []
+    for _ in range(400):
+        in_tunnel = xs and min(xs) <= 0.5
+        action = ACTIONS.index(Direction.W) if in_tunnel else get_action(maze, obs['pos'][PACMAN], (14, 0))
+        obs, reward, done, info = env.step(action)
+        assert not done
+        check_planes(env)
+        xs.append(pacman.pos.x)
+        if xs[-1] > maze.ncols-3 and min(xs) < 0:
+            break
+    assert min(xs) < 0 and xs[-1] > maze.ncols-3
+
+def test_rewards_sum_to_score():
+    env = PacmanEnv()
+    env.reset(seed=1)
+    total, done = 0, False
+    while not done:
+        obs, reward, done, info = env.step(env.rng.integers(len(ACTIONS)+1))
+        total += reward
+        assert total == info['score']
+    assert total > 0
+
+    vec = VecPacmanEnv(8)
+    vec.reset(seed=1)
+    totals = np.zeros(vec.nenvs, dtype=np.int64)
+    for _ in range(600):
+        obs, rewards, dones, info = vec.step(vec.rng.integers(len(ACTIONS)+1, size=vec.nenvs))
+        totals += rewards
+        assert np.array_equal(totals, info['score'])
+
+def test_vec_cleared_matches_maze():
+    # the same game on a PacmanEnv (whose Maze tracks the dots) and a one-game VecPacmanEnv, played until
+    # every dot is eaten
+    env = PacmanEnv()
+    env.reset()
+    freeze_ghosts(env.sim)
+    vec = VecPacmanEnv(1)
+    vec.reset()
+    freeze_batch_ghosts(vec.batch)
+    maze = env.sim.maze
+
+    target = None
+    for _ in range(5000):
+        # head for the closest dot, and stick with it until it is eaten so the player never dithers
+        pos = env.sim.pacman.pos.get_tuple()
+        if not target in maze.dots and maze.dots:
+            target = min(maze.dots, key=lambda rc: (rc[0]-pos[1])**2 + (rc[1]-pos[0])**2)
+        action = get_action(maze, np.array(pos), target)
+        obs, reward, done, info = env.step(action)
+        vobs, vrewards, vdones, vinfo = vec.step(np.array([action]))
+
+        assert vinfo['score'][0] == info['score'] and np.array_equal(vobs['pos'][0], obs['pos'])
+        assert vinfo['cleared'][0] == maze.is_cleared() == info['cleared']
+        if done:
+            break
+    assert info['cleared'] and vdones[0]
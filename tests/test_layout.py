@@ -0,0 +1,15 @@
+#!/usr/bin/env python
+from structures.layout import *
+
+def test_large_layout_round_trip(tmp_path):
+    # 300x300 has dots at flat indices past 65,535
+    text = '\n'.join(['E'*300] + ['E' + 'o'*298 + 'E']*298 + ['E'*300])
+    path = tmp_path / 'big.txt'
+    path.write_text(text)
+
+    compiled = load_layout(path, cache_dir=tmp_path) # miss: compiles and writes the cache
+    cached = load_layout(path, cache_dir=tmp_path)   # hit: read back through mmap
+
+    assert max(cached.dots) > 0xFFFF
+    assert (cached.nrows, cached.ncols) == (300, 300)
+    assert cached.grid == compiled.grid and list(cached.dots) == list(compiled.dots)
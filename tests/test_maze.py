@@ -0,0 +1,114 @@
+#!/usr/bin/env python
+from collections import deque
+
+from structures.maze import *
+from structures.agent import Player, Enemy
+
+def get_bfs_dists(maze: Maze, r0: int, c0: int, bits: int) -> dict[tuple[int, int], int]:
+    """Plain BFS from (r0, c0) over in-grid passable tiles, wrapping through the tunnel like the maze does."""
+
+    dists = {(r0, c0): 0}
+    queue = deque([(r0, c0)])
+    while queue:
+        r, c = queue.popleft()
+        for dx, dy in OPEN_VECS:
+            ar, ac = maze._wrap_rc(r+dy, c+dx)
+            if 0 <= ar < maze.nrows and 0 <= ac < maze.ncols and not (ar, ac) in dists \
+                and (bits >> maze.get_code_rc(ar, ac)) & 1:
+                dists[(ar, ac)] = dists[(r, c)] + 1
+                queue.append((ar, ac))
+
+    return dists
+
+def test_path_table_matches_bfs():
+    maze = Maze()
+    maze.init()
+
+    for tiles in (PLAYER_TILES, GHOST_TILES, HOME_TILES):
+        bits = get_tile_bits(tiles)
+        ids, n, table = maze.get_dist_table(bits, PATH)
+        nodes = [divmod(i, maze.ncols) for i in range(maze.nrows*maze.ncols) if ids[i] >= 0]
+        assert len(nodes) == n
+
+        for r0, c0 in nodes:
+            dists = get_bfs_dists(maze, r0, c0, bits)
+            row = ids[r0*maze.ncols+c0]*n
+            for r1, c1 in nodes:
+                assert table[row + ids[r1*maze.ncols+c1]] == dists.get((r1, c1), NO_PATH), (tiles, r0, c0, r1, c1)
+
+def test_turn_cache_survives_dots_only():
+    maze = Maze()
+    maze.init()
+    bits = get_tile_bits(GHOST_TILES)
+    maze.get_turn(ListCoord(1, 1), Direction.E, ListCoord(20, 20), bits)
+
+    r, c = next(iter(maze.dots))
+    maze.set_tile_rc(r, c, Tile.EMPTY) # eating a dot changes no passable set
+    assert len(maze.turn_cache) == 1
+
+    maze.set_tile_rc(r, c, Tile.EDGE)
+    assert len(maze.turn_cache) == 0 and not maze.turn_bits
+
+def test_tunnel_follows_layout(shifted_maze):
+    maze = shifted_maze
+    assert maze.tunnels == ((16, 6, 6),)
+    assert maze.get_tile_rc(16, -1) == Tile.EMPTY and maze.get_tile_rc(14, -1) == Tile.OOB
+    assert maze.get_open_rc(16, 0, get_tile_bits(PLAYER_TILES)) == OPEN_BITS[Direction.E] | OPEN_BITS[Direction.W]
+
+    # walk west out of the left end of the tunnel and back in from the right
+    player = Player(None, (3, 16), speed_vec=(-1, 0), speed_norm=0.15)
+    cols = []
+    for _ in range(60):
+        player.update_pos(maze)
+        assert player.is_moving and player.list_pos.y == 16
+        cols.append(player.list_pos.x)
+    assert 0 in cols and cols[-1] > maze.ncols-6
+
+def test_ghost_leaves_house_of_layout(shifted_maze):
+    maze = shifted_maze
+    assert maze.exit == ListCoord(maze.ncols//2-1, 13)
+
+    ghost = Enemy(None, (maze.ncols//2-1, 16), speed_vec=(0, -1), speed_norm=0.15)
+    ghost.waiting = False
+    for _ in range(60):
+        ghost.update_speed(maze)
+        ghost.move(maze, correct_pos=(not ghost.at_home))
+    assert not ghost.at_home and ghost.list_pos.y < 13
+
+def test_flow_field_follows_shortest_paths():
+    maze = Maze()
+    maze.init()
+    bits = get_tile_bits(PLAYER_TILES)
+
+    # a corner, the middle of the tunnel and a tile just above the house
+    for tr, tc in ((1, 1), (14, 0), (11, 13)):
+        target = ListCoord(tc, tr)
+        dists = get_bfs_dists(maze, tr, tc, bits)
+        for (r, c), dist in dists.items():
+            nmoves = 0
+            while (r, c) != (tr, tc):
+                dir = maze.get_flow_dir(ListCoord(c, r), target, bits)
+                assert not dir is None and nmoves < dist, (tr, tc, r, c)
+                dx, dy = DIR_VECS[dir]
+                r, c = maze._wrap_rc(r+dy, c+dx)
+                nmoves += 1
+            assert nmoves == dist
+        assert maze.get_flow_dir(target, target, bits) is None
+
+def test_flow_field_cache():
+    maze = Maze()
+    maze.init()
+    bits = get_tile_bits(PLAYER_TILES)
+    target = ListCoord(1, 1)
+
+    field = maze.get_flow_field(target, bits)
+    assert maze.get_flow_field(ListCoord(1, 1), bits) is field
+    assert maze.get_flow_field(target, get_tile_bits(HOME_TILES)) is not field
+
+    r, c = next(iter(maze.dots))
+    maze.set_tile_rc(r, c, Tile.EMPTY) # eating a dot keeps the field
+    assert maze.get_flow_field(target, bits) is field
+
+    maze.set_tile_rc(1, 2, Tile.EDGE) # walling off the tile next to the target rebuilds it
+    rebuilt = maze.get_flow_field(target, bits)
+    assert rebuilt is not field and rebuilt[1*maze.ncols+2] == NO_FLOW
@@ -0,0 +1,46 @@
+#!/usr/bin/env python
+import random
+
+from structures.maze import *
+from structures.sim import Simulation, GhostMode
+
+def get_inputs(seed: int, nframes: int) -> list:
+    rng = random.Random(seed)
+    return [rng.choice(OPEN_DIRS) if rng.random() < 0.05 else None for _ in range(nframes)]
+
+def get_trajectory(sim: Simulation, inputs: list) -> list:
+    agents = (sim.pacman, sim.blinky, sim.pinky, sim.inky)
+    trajectory = []
+    for dir in inputs:
+        sim.step(dir)
+        trajectory.append((sim.playing, sim.pacman.score, bytes(sim.maze.grid),
+                           [(a.pos.get_tuple(), a.list_pos.get_tuple(), a.speed_vec.get_tuple()) for a in agents]))
+
+    return trajectory
+
+def test_clone_branches_leave_parent_unchanged():
+    sim = Simulation()
+    sim.init()
+    sim.step(get_inputs(0, 120), n=120)
+    start = sim.snapshot()
+    grid, dots, score = bytes(sim.maze.grid), set(sim.maze.dots), sim.pacman.score
+
+    # the parent's own future, played from the branch point
+    expected = get_trajectory(sim, get_inputs(1, 300))
+    sim.restore(start)
+
+    # a branch that eats dots and plays on in a different direction
+    branch = sim.clone()
+    branch.step(get_inputs(2, 300), n=300)
+    assert branch.pacman.score > score and branch.maze.grid != sim.maze.grid
+    branch.mode_changes[0] = 0
+    branch.MODES.reverse()
+
+    assert bytes(sim.maze.grid) == grid and sim.maze.dots == dots and sim.pacman.score == score
+    assert sim.mode_changes[0] == 7 and sim.MODES == list(GhostMode)
+    assert sim.snapshot() == start
+
+    # stepping the parent again gives the same trajectory bit for bit, and so does a restore after it
+    assert get_trajectory(sim, get_inputs(1, 300)) == expected
+    sim.restore(start)
+    assert get_trajectory(sim, get_inputs(1, 300)) == expected
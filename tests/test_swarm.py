@@ -0,0 +1,50 @@
+#!/usr/bin/env python
+import random
+
+import numpy as np
+import pytest
+
+from structures.maze import *
+from structures.sim import Simulation
+from structures.agent import Enemy
+from structures.swarm import EnemySwarm
+
+def test_swarm_matches_enemies():
+    rng = random.Random(0)
+    sim = Simulation()
+    sim.init()
+    ghosts = [sim.blinky, sim.pinky, sim.inky]
+    swarm = EnemySwarm.from_enemies(sim.maze, ghosts)
+
+    while sim.step(rng.choice(OPEN_DIRS) if rng.random() < 0.05 else None):
+        # targets are set before the ghosts move, and left as they were used
+        swarm.target[:] = [g.target.get_tuple() for g in ghosts]
+        swarm.update()
+        assert swarm.pos.tolist() == [list(g.pos.get_tuple()) for g in ghosts], sim.nframes
+        assert swarm.list_pos.tolist() == [list(g.list_pos.get_tuple()) for g in ghosts], sim.nframes
+        assert swarm.at_home.tolist() == [g.at_home for g in ghosts], sim.nframes
+
+def test_swarm_leaves_house_and_tunnels_on_layout(shifted_maze):
+    maze = shifted_maze
+    # one ghost in the house and one heading west into the tunnel (row 16 here, not the classic 14)
+    ghosts = [Enemy(None, (maze.ncols//2-1, 16), speed_vec=(0, -1), speed_norm=0.15),
+              Enemy(None, (3, 16), target=(maze.ncols-3, 16), speed_vec=(-1, 0), speed_norm=0.15)]
+    ghosts[0].waiting = ghosts[1].waiting = False
+    ghosts[1].at_home = False
+    ghosts[1].passable_tiles = list(GHOST_TILES)
+    swarm = EnemySwarm.from_enemies(maze, ghosts)
+
+    cols = []
+    for _ in range(60):
+        for g in ghosts:
+            g.update_speed(maze)
+            g.move(maze, correct_pos=(not g.at_home))
+        swarm.update()
+        assert swarm.pos.tolist() == [list(g.pos.get_tuple()) for g in ghosts]
+        assert swarm.at_home.tolist() == [g.at_home for g in ghosts]
+        cols.append(int(swarm.list_pos[1, 0]))
+
+    assert not swarm.at_home[0]
+    assert swarm.list_pos[1, 1] == 16 and 0 in cols and cols[-1] > maze.ncols-6
+    # slowed down while in the tunnel
+    assert swarm.pos[1, 0] == pytest.approx(3 - 60*0.15*0.6 + maze.ncols+1)
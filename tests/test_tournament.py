@@ -0,0 +1,18 @@
+#!/usr/bin/env python
+from structures.sim import Simulation
+from structures.tournament import SPEED_REDUCTION, apply_settings
+
+def get_ghosts(settings: dict = None) -> tuple:
+    sim = Simulation()
+    sim.init()
+    if not settings is None:
+        apply_settings(sim, settings)
+    return (sim.blinky, sim.pinky, sim.inky)
+
+def test_slow_norm_follows_ghost_speed():
+    # no overrides leaves the speeds bit-identical to a plain Simulation's
+    assert [g.slow_norm for g in get_ghosts({})] == [g.slow_norm for g in get_ghosts()]
+
+    assert all(g.speed_norm == 0.2 and g.slow_norm == 0.2*SPEED_REDUCTION for g in get_ghosts({'ghost_speed': 0.2}))
+    assert all(g.slow_norm == 0.2*0.5 for g in get_ghosts({'ghost_speed': 0.2, 'speed_reduction': 0.5}))
+    assert all(g.slow_norm == 0.15*0.5 for g in get_ghosts({'speed_reduction': 0.5}))